@@ -0,0 +1,134 @@
+# backend/authentication/blacklist.py
+import hashlib
+import math
+import threading
+import time
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set: membership tests never give false
+    negatives, and give false positives at roughly ``error_rate`` while
+    holding no more than ``capacity`` items.
+    """
+    
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+    
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, item):
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class TokenBlacklist:
+    """
+    Revoked refresh tokens, with an in-process Bloom filter in front of the
+    RevokedToken table so most lookups never reach the database.
+    
+    The filter picks up revocations made by other processes by reading new
+    rows (by increasing id) at most once every ``sync_interval`` seconds.
+    Ids are allocated before commit, so each sync also re-reads the last
+    ``rescan_window`` ids it has seen to catch rows that committed late.
+    """
+    
+    def __init__(self, capacity=100000, error_rate=0.01, sync_interval=1.0, rescan_window=100):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rescan_window = rescan_window
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Forget the in-memory filter; it is rebuilt on next use"""
+        with self._lock:
+            self._filter = None
+            self._last_id = 0
+            self._synced_at = 0.0
+    
+    def _sync(self):
+        if self._filter is None or self._filter.count > self._filter.capacity:
+            capacity = max(self.capacity, 2 * RevokedToken.objects.count())
+            self._filter = BloomFilter(capacity, self.error_rate)
+            self._last_id = 0
+        
+        start = max(0, self._last_id - self.rescan_window)
+        rows = RevokedToken.objects.filter(id__gt=start).order_by('id')
+        for row_id, jti in rows.values_list('id', 'jti').iterator():
+            if jti not in self._filter:
+                self._filter.add(jti)
+            self._last_id = max(self._last_id, row_id)
+        self._synced_at = time.monotonic()
+    
+    def is_revoked(self, jti):
+        """Check whether a token JTI has been revoked"""
+        with self._lock:
+            if self._filter is None or time.monotonic() - self._synced_at >= self.sync_interval:
+                self._sync()
+            maybe_revoked = jti in self._filter
+        
+        if not maybe_revoked:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+    
+    def revoke(self, jti, expires_at):
+        """
+        Revoke a token JTI.
+        
+        Returns:
+            bool: False if the JTI had already been revoked
+        """
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+            created = True
+        except IntegrityError:
+            created = False
+        
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+        return created
+    
+    def prune(self, now=None):
+        """
+        Delete revocations whose tokens have expired, in one bulk DELETE.
+        
+        Returns:
+            int: Number of revocations removed
+        """
+        now = now or timezone.now()
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=now).delete()
+        if deleted:
+            self.reset()
+        return deleted
+
+
+token_blacklist = TokenBlacklist(
+    capacity=getattr(settings, 'TOKEN_BLACKLIST_FILTER_CAPACITY', 100000),
+    error_rate=getattr(settings, 'TOKEN_BLACKLIST_FILTER_ERROR_RATE', 0.01),
+    sync_interval=getattr(settings, 'TOKEN_BLACKLIST_SYNC_INTERVAL', 1.0),
+    rescan_window=getattr(settings, 'TOKEN_BLACKLIST_RESCAN_WINDOW', 100),
+)
@@ -0,0 +1,71 @@
+# backend/authentication/management/commands/import_users.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from authentication.provisioning import import_users, parse_users
+from authentication.serializers import UserRegistrationSerializer
+
+
+class Command(BaseCommand):
+    help = 'Create users in bulk from a CSV or NDJSON file'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with header row) or NDJSON file of users')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Password hashing processes (default: every CPU)')
+        parser.add_argument('--benchmark', action='store_true',
+                            help='Compare against one-by-one registration; nothing is kept')
+    
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as handle:
+                rows = parse_users(handle.read())
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(f'Could not read {options["path"]}: {e}')
+        
+        if options['benchmark']:
+            self._benchmark(rows, options)
+            return
+        
+        started = time.perf_counter()
+        report = import_users(rows, options['batch_size'], options['workers'])
+        elapsed = time.perf_counter() - started
+        
+        for error in report['errors']:
+            self.stderr.write(f'row {error["row"]}: {error["errors"]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {report["created"]} user(s) in {elapsed:.2f}s, '
+            f'{len(report["errors"])} row(s) rejected'
+        ))
+    
+    def _benchmark(self, rows, options):
+        with transaction.atomic():
+            started = time.perf_counter()
+            created = 0
+            for _, data in rows:
+                if data is None:
+                    continue
+                data = dict(data)
+                data.setdefault('password_confirm', data.get('password'))
+                serializer = UserRegistrationSerializer(data=data)
+                if serializer.is_valid():
+                    serializer.save()
+                    created += 1
+            sequential = time.perf_counter() - started
+            transaction.set_rollback(True)
+        
+        with transaction.atomic():
+            started = time.perf_counter()
+            report = import_users(rows, options['batch_size'], options['workers'])
+            bulk = time.perf_counter() - started
+            transaction.set_rollback(True)
+        
+        self.stdout.write(
+            f'sequential registration: {created} users in {sequential:.2f}s '
+            f'({created / sequential:,.1f} users/s)'
+        )
+        self.stdout.write(
+            f'bulk import: {report["created"]} users in {bulk:.2f}s '
+            f'({report["created"] / bulk:,.1f} users/s)'
+        )
@@ -0,0 +1,11 @@
+# backend/authentication/management/commands/prune_revoked_tokens.py
+from django.core.management.base import BaseCommand
+from authentication.blacklist import token_blacklist
+
+
+class Command(BaseCommand):
+    help = 'Delete revoked refresh tokens that have already expired'
+    
+    def handle(self, *args, **options):
+        deleted = token_blacklist.prune()
+        self.stdout.write(f'Pruned {deleted} expired revoked token(s)')
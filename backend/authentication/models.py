@@ -18,4 +18,16 @@ class User(AbstractUser):
     
     class Meta:
         verbose_name = 'User'
-        verbose_name_plural = 'Users'
\ No newline at end of file
+        verbose_name_plural = 'Users'
+
+
+class RevokedToken(models.Model):
+    """
+    Append-only record of refresh token JTIs revoked by rotation.
+    Rows are pruned in bulk once the token itself has expired.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,183 @@
+# backend/authentication/provisioning.py
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from .serializers import BulkUserRegistrationSerializer
+
+User = get_user_model()
+
+# Stay well under SQLite's limit on the number of query parameters
+LOOKUP_CHUNK_SIZE = 500
+
+
+def parse_users(content):
+    """
+    Parse uploaded users from CSV (with a header row) or NDJSON.
+    
+    Returns:
+        list: (row number, dict) pairs; the dict is None for malformed rows
+    """
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    
+    if content.lstrip().startswith('{'):
+        rows = []
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                data = None
+            rows.append((len(rows) + 1, data if isinstance(data, dict) else None))
+        return rows
+    
+    reader = csv.DictReader(io.StringIO(content))
+    return [(number, dict(row)) for number, row in enumerate(reader, start=1)]
+
+
+def _setup_django():
+    """Process pool initializer for platforms that spawn rather than fork"""
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sweet_shop.settings')
+    django.setup()
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    Hash passwords across a process pool.
+    
+    Args:
+        passwords (list): Raw passwords
+        workers (int): Pool size; None uses every CPU, 1 hashes in-process
+    """
+    if workers == 1 or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    
+    pool_size = workers or os.cpu_count() or 1
+    chunksize = max(1, len(passwords) // (pool_size * 4))
+    with ProcessPoolExecutor(max_workers=pool_size, initializer=_setup_django) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def _existing_values(field, values):
+    """Look up which of the given values are already taken, in chunks"""
+    existing = set()
+    values = list(values)
+    for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        chunk = values[start:start + LOOKUP_CHUNK_SIZE]
+        existing.update(
+            User.objects.filter(**{f'{field}__in': chunk}).values_list(field, flat=True)
+        )
+    return existing
+
+
+def _clash_errors(username, email, taken_usernames, taken_emails):
+    """Field errors for a username or email that is already taken"""
+    row_errors = {}
+    if username in taken_usernames:
+        row_errors['username'] = ['A user with that username already exists.']
+    if email in taken_emails:
+        row_errors['email'] = ['user with this email already exists.']
+    return row_errors
+
+
+def _insert_batch(batch, errors):
+    """
+    Insert one batch of (row number, User) pairs in its own transaction.
+    
+    If a concurrent signup took a username or email after the pre-check, the
+    batch's values are looked up again, the clashing rows are reported in
+    ``errors`` and the rest of the batch is retried.
+    
+    Returns:
+        int: Number of users created
+    """
+    while batch:
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([user for _, user in batch])
+            return len(batch)
+        except IntegrityError:
+            taken_usernames = _existing_values('username', {user.username for _, user in batch})
+            taken_emails = _existing_values('email', {user.email for _, user in batch})
+            remaining = []
+            for number, user in batch:
+                row_errors = _clash_errors(user.username, user.email, taken_usernames, taken_emails)
+                if row_errors:
+                    errors.append({'row': number, 'errors': row_errors})
+                else:
+                    remaining.append((number, user))
+            if len(remaining) == len(batch):
+                raise
+            batch = remaining
+    return 0
+
+
+def import_users(rows, batch_size=None, workers=None):
+    """
+    Validate and create many users at once.
+    
+    Rows are validated with the registration rules, checked for username and
+    email clashes with one query per chunk, hashed in parallel and inserted
+    with bulk_create, one transaction per batch. A row may omit
+    password_confirm.
+    
+    Returns:
+        dict: {'created': count, 'errors': [{'row': number, 'errors': {...}}]}
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'USER_IMPORT_BATCH_SIZE', 500)
+    if workers is None:
+        workers = getattr(settings, 'USER_IMPORT_HASH_WORKERS', None)
+    
+    errors = []
+    candidates = []
+    for number, data in rows:
+        if data is None:
+            errors.append({'row': number, 'errors': {'non_field_errors': ['Malformed row']}})
+            continue
+        data = dict(data)
+        data.setdefault('password_confirm', data.get('password'))
+        serializer = BulkUserRegistrationSerializer(data=data)
+        if not serializer.is_valid():
+            errors.append({'row': number, 'errors': serializer.errors})
+            continue
+        validated = serializer.validated_data
+        candidates.append((
+            number,
+            User.normalize_username(validated['username']),
+            User.objects.normalize_email(validated['email']),
+            validated['password'],
+        ))
+    
+    taken_usernames = _existing_values('username', {c[1] for c in candidates})
+    taken_emails = _existing_values('email', {c[2] for c in candidates})
+    
+    accepted = []
+    for number, username, email, password in candidates:
+        row_errors = _clash_errors(username, email, taken_usernames, taken_emails)
+        if row_errors:
+            errors.append({'row': number, 'errors': row_errors})
+            continue
+        taken_usernames.add(username)
+        taken_emails.add(email)
+        accepted.append((number, username, email, password))
+    
+    hashed = hash_passwords([password for *_, password in accepted], workers)
+    users = [
+        (number, User(username=username, email=email, password=password_hash))
+        for (number, username, email, _), password_hash in zip(accepted, hashed)
+    ]
+    created = 0
+    for start in range(0, len(users), batch_size):
+        created += _insert_batch(users[start:start + batch_size], errors)
+    
+    errors.sort(key=lambda error: error['row'])
+    return {'created': created, 'errors': errors}
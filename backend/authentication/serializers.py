@@ -1,7 +1,10 @@
 # backend/authentication/serializers.py
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from .tokens import RevocableRefreshToken
 
 User = get_user_model()
 
@@ -45,9 +48,30 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
+class BulkUserRegistrationSerializer(UserRegistrationSerializer):
+    """
+    Registration rules for bulk imports; username and email uniqueness is
+    checked for the whole batch at once instead of one query per row
+    """
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        for field in fields.values():
+            field.validators = [
+                validator for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return fields
+
+
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for user data"""
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'is_admin', 'date_joined')
-        read_only_fields = ('id', 'date_joined')
\ No newline at end of file
+        read_only_fields = ('id', 'date_joined')
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """Token refresh serializer that honours and records token revocation"""
+    token_class = RevocableRefreshToken
@@ -0,0 +1,77 @@
+# backend/authentication/tests/test_blacklist.py
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from authentication.blacklist import BloomFilter, TokenBlacklist
+from authentication.models import RevokedToken
+
+
+class TestBloomFilter:
+    
+    def test_added_items_are_always_found(self):
+        """Test the filter never reports a false negative"""
+        bloom = BloomFilter(capacity=1000)
+        items = [f'jti-{index}' for index in range(1000)]
+        for item in items:
+            bloom.add(item)
+        
+        assert all(item in bloom for item in items)
+    
+    def test_false_positive_rate_stays_near_target(self):
+        """Test unseen items are rarely reported as present"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for index in range(1000):
+            bloom.add(f'jti-{index}')
+        
+        false_positives = sum(f'other-{index}' in bloom for index in range(10000))
+        assert false_positives < 300
+
+
+@pytest.mark.django_db
+class TestTokenBlacklist:
+    
+    def test_unrevoked_token_skips_database(self, django_assert_num_queries):
+        """Test a token absent from the filter is accepted without a query"""
+        blacklist = TokenBlacklist(sync_interval=60)
+        blacklist.is_revoked('warm-up')
+        
+        with django_assert_num_queries(0):
+            assert blacklist.is_revoked('never-revoked') is False
+    
+    def test_revoke_is_seen_and_only_succeeds_once(self):
+        """Test a revoked token is reported and cannot be revoked twice"""
+        blacklist = TokenBlacklist()
+        expires_at = timezone.now() + timedelta(days=1)
+        
+        assert blacklist.revoke('abc', expires_at) is True
+        assert blacklist.revoke('abc', expires_at) is False
+        assert blacklist.is_revoked('abc') is True
+    
+    def test_revocations_from_other_processes_are_synced(self):
+        """Test rows written elsewhere are picked up on the next sync"""
+        blacklist = TokenBlacklist(sync_interval=0)
+        blacklist.is_revoked('warm-up')
+        RevokedToken.objects.create(jti='elsewhere', expires_at=timezone.now() + timedelta(days=1))
+        
+        assert blacklist.is_revoked('elsewhere') is True
+    
+    def test_late_committed_revocations_are_synced(self):
+        """Test a row whose id is below ones already synced is still picked up"""
+        blacklist = TokenBlacklist(sync_interval=0)
+        expires_at = timezone.now() + timedelta(days=1)
+        RevokedToken.objects.create(id=10, jti='early-commit', expires_at=expires_at)
+        blacklist.is_revoked('warm-up')
+        RevokedToken.objects.create(id=5, jti='late-commit', expires_at=expires_at)
+        
+        assert blacklist.is_revoked('late-commit') is True
+    
+    def test_prune_removes_only_expired_revocations(self):
+        """Test pruning deletes revocations whose tokens have expired"""
+        blacklist = TokenBlacklist()
+        now = timezone.now()
+        blacklist.revoke('expired', now - timedelta(minutes=1))
+        blacklist.revoke('live', now + timedelta(days=1))
+        
+        assert blacklist.prune(now) == 1
+        assert blacklist.is_revoked('expired') is False
+        assert blacklist.is_revoked('live') is True
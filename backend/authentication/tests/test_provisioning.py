@@ -0,0 +1,87 @@
+# backend/authentication/tests/test_provisioning.py
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+from authentication import provisioning
+from authentication.provisioning import hash_passwords, import_users, parse_users
+
+User = get_user_model()
+
+
+def test_parse_users_reads_csv_and_ndjson():
+    """Test both upload formats produce numbered rows"""
+    csv_rows = parse_users(b'username,email,password\nann,ann@example.com,Sweet-pass-123\n')
+    ndjson_rows = parse_users('{"username": "ann"}\nnot json\n')
+    
+    assert csv_rows == [(1, {'username': 'ann', 'email': 'ann@example.com', 'password': 'Sweet-pass-123'})]
+    assert ndjson_rows == [(1, {'username': 'ann'}), (2, None)]
+
+
+def test_hash_passwords_across_process_pool():
+    """Test passwords hashed in worker processes verify normally"""
+    hashed = hash_passwords(['first-secret', 'second-secret'], workers=2)
+    
+    assert check_password('first-secret', hashed[0])
+    assert check_password('second-secret', hashed[1])
+
+
+@pytest.mark.django_db
+class TestImportUsers:
+    
+    def test_valid_rows_are_created_and_invalid_rows_reported(self):
+        """Test valid users are inserted and each rejected row is reported"""
+        User.objects.create_user(username='taken', email='taken@example.com', password='Sweet-pass-123')
+        rows = [
+            (1, {'username': 'ann', 'email': 'ann@example.com', 'password': 'Sweet-pass-123'}),
+            (2, {'username': 'bob', 'email': 'taken@example.com', 'password': 'Sweet-pass-123'}),
+            (3, {'username': 'cat', 'email': 'ann@example.com', 'password': 'Sweet-pass-123'}),
+            (4, {'username': 'dan', 'email': 'dan@example.com', 'password': '123'}),
+            (5, None),
+        ]
+        
+        report = import_users(rows, workers=1)
+        
+        assert report['created'] == 1
+        assert [error['row'] for error in report['errors']] == [2, 3, 4, 5]
+        assert 'email' in report['errors'][0]['errors']
+        assert 'password' in report['errors'][2]['errors']
+        assert User.objects.get(username='ann').check_password('Sweet-pass-123')
+    
+    def test_uniqueness_checked_in_bulk(self, django_assert_max_num_queries):
+        """Test username and email clashes are found without a query per row"""
+        rows = [
+            (number, {
+                'username': f'user{number}',
+                'email': f'user{number}@example.com',
+                'password': 'Sweet-pass-123'
+            })
+            for number in range(1, 21)
+        ]
+        
+        with django_assert_max_num_queries(5):
+            report = import_users(rows, workers=1)
+        assert report['created'] == 20
+    
+    def test_clash_after_precheck_is_reported_per_row(self, monkeypatch):
+        """Test a username taken between the pre-check and the insert is reported, not a 500"""
+        User.objects.create_user(username='raced', email='raced@example.com', password='Sweet-pass-123')
+        lookup = provisioning._existing_values
+        calls = []
+        
+        def stale_precheck(field, values):
+            calls.append(field)
+            return set() if len(calls) <= 2 else lookup(field, values)
+        
+        monkeypatch.setattr(provisioning, '_existing_values', stale_precheck)
+        rows = [
+            (1, {'username': 'ann', 'email': 'ann@example.com', 'password': 'Sweet-pass-123'}),
+            (2, {'username': 'raced', 'email': 'other@example.com', 'password': 'Sweet-pass-123'}),
+        ]
+        
+        report = import_users(rows, workers=1)
+        
+        assert report['created'] == 1
+        assert report['errors'] == [
+            {'row': 2, 'errors': {'username': ['A user with that username already exists.']}}
+        ]
+        assert User.objects.filter(username='ann').exists()
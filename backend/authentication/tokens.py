@@ -0,0 +1,32 @@
+# backend/authentication/tokens.py
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from .blacklist import token_blacklist
+
+
+class RevocableRefreshToken(RefreshToken):
+    """
+    Refresh token checked against the project's token blacklist
+    """
+    
+    def verify(self, *args, **kwargs):
+        if token_blacklist.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+        super().verify(*args, **kwargs)
+    
+    def blacklist(self):
+        """
+        Revoke this token.
+        
+        Raises:
+            TokenError: If the token was already revoked by a concurrent request
+        """
+        revoked = token_blacklist.revoke(
+            self.payload[api_settings.JTI_CLAIM],
+            datetime_from_epoch(self.payload['exp'])
+        )
+        if not revoked:
+            raise TokenError(_("Token is blacklisted"))
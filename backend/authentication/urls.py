@@ -1,10 +1,11 @@
 # backend/authentication/urls.py
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
-from .views import RegisterView, LoginView
+from .views import RegisterView, LoginView, UserImportView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('users/import/', UserImportView.as_view(), name='user_import'),
 ]
\ No newline at end of file
@@ -1,9 +1,14 @@
 # backend/authentication/views.py
+import csv
 from rest_framework import status, generics
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
 from django.contrib.auth import authenticate
+from sweets.permissions import IsAdmin
+from .provisioning import import_users, parse_users
 from .serializers import UserRegistrationSerializer, UserSerializer
 
 class RegisterView(generics.CreateAPIView):
@@ -63,4 +68,42 @@ class LoginView(generics.GenericAPIView):
                 'access': str(refresh.access_token),
             },
             'message': 'Login successful'
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }, status=status.HTTP_200_OK)
+
+
+class UserImportView(generics.GenericAPIView):
+    """
+    API endpoint for bulk user provisioning (Admin only)
+    Accepts CSV or NDJSON either as a multipart "file" upload or as the raw body
+    Runs inside the request, so uploads over USER_IMPORT_MAX_ROWS rows are
+    rejected with 413; split larger files
+    """
+    permission_classes = (IsAuthenticated, IsAdmin)
+    parser_classes = (MultiPartParser,)
+    
+    def post(self, request):
+        if request.content_type.startswith('multipart/form-data'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                return Response({
+                    'error': 'Please upload a file'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            content = upload.read()
+        else:
+            content = request.body
+        
+        try:
+            rows = parse_users(content)
+        except (UnicodeDecodeError, csv.Error):
+            return Response({
+                'error': 'Upload must be UTF-8 CSV or NDJSON'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        max_rows = getattr(settings, 'USER_IMPORT_MAX_ROWS', 2000)
+        if len(rows) > max_rows:
+            return Response({
+                'error': f'Upload has {len(rows)} rows; at most {max_rows} are accepted per request'
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        
+        report = import_users(rows)
+        return Response(report, status=status.HTTP_200_OK)
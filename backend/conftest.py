@@ -0,0 +1,24 @@
+# backend/conftest.py
+import pytest
+from decimal import Decimal
+from sweets.models import Sweet
+
+
+@pytest.fixture(autouse=True)
+def run_tasks_synchronously(settings):
+    """Run background tasks inline so tests can assert on their effects"""
+    settings.TASKS_ALWAYS_SYNC = True
+
+
+@pytest.fixture
+def create_sweet(db):
+    def make_sweet(**kwargs):
+        defaults = {
+            'name': 'Test Sweet',
+            'category': 'Test',
+            'price': Decimal('10.00'),
+            'quantity': 50
+        }
+        defaults.update(kwargs)
+        return Sweet.objects.create(**defaults)
+    return make_sweet
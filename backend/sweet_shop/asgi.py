@@ -1,8 +1,61 @@
 """
 ASGI config for sweet_shop project.
+
+Serve with an ASGI server (e.g. ``uvicorn sweet_shop.asgi:application``) so the
+live stock stream at /api/sweets/stream/ holds connections without tying up
+worker threads.
 """
+import asyncio
 import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sweet_shop.settings')
-application = get_asgi_application()
\ No newline at end of file
+
+
+class CancelOnDisconnect:
+    """
+    Cancel a request when the client goes away.
+    
+    Django 4.2 only listens for ``http.disconnect`` while reading the request
+    body, and servers drop sends to closed connections silently, so a
+    streaming response would otherwise run until it ends on its own. Once
+    the body has been read this keeps listening and cancels the handler on
+    disconnect, which closes the response's iterator.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        
+        body_read = asyncio.Event()
+        disconnected = False
+        
+        async def receive_body():
+            message = await receive()
+            if message['type'] != 'http.request' or not message.get('more_body', False):
+                body_read.set()
+            return message
+        
+        async def watch():
+            nonlocal disconnected
+            await body_read.wait()
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected = True
+            handler.cancel()
+        
+        handler = asyncio.ensure_future(self.app(scope, receive_body, send))
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+        finally:
+            watcher.cancel()
+
+
+application = CancelOnDisconnect(get_asgi_application())
@@ -110,6 +110,48 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Maximum number of ids accepted by /api/sweets/batch/
+SWEETS_BATCH_MAX_SIZE = 100
+
+# Delta sync (/api/sweets/changes/): sweets per page, and seconds recent
+# writes are held back so transactions still committing are not skipped
+SWEETS_SYNC_PAGE_SIZE = 500
+SWEETS_SYNC_SAFETY_LAG = 5
+
+# Live stock stream (/api/sweets/stream/): distinct sweets a client may fall
+# behind by before being dropped, and seconds between keep-alive comments
+SWEETS_STREAM_MAX_PENDING = 100
+SWEETS_STREAM_KEEPALIVE = 15
+
+# Typeahead (/api/sweets/suggest/): results per request, index size cap (keys)
+# and seconds between picking up other workers' changes
+SWEETS_SUGGEST_LIMIT = 10
+SWEETS_SUGGEST_MAX_ENTRIES = 200000
+SWEETS_SUGGEST_REFRESH_INTERVAL = 5.0
+
+# Shared catalog snapshot for list/retrieve: a file every worker memory-maps,
+# e.g. BASE_DIR / 'catalog.snapshot'. None serves from the ORM. The catalog
+# version is checked at most every SWEETS_SNAPSHOT_CHECK_INTERVAL seconds and
+# a stale file is rebuilt by a background task; run
+# `manage.py build_catalog_snapshot` on deploy to build the first one.
+SWEETS_SNAPSHOT_PATH = None
+SWEETS_SNAPSHOT_CHECK_INTERVAL = 2.0
+
+# Background tasks (sweets.taskqueue): worker threads, queue bound, lease
+# before a stuck durable task is retried, and inline execution for tests
+TASKS_WORKERS = 4
+TASKS_MAX_QUEUE = 1000
+TASKS_LEASE_SECONDS = 300
+TASKS_ALWAYS_SYNC = False
+
+# Identical concurrent GETs on the sweets API share one response; waiters give
+# up after SWEETS_COALESCE_TIMEOUT seconds and compute their own
+SWEETS_COALESCE_REQUESTS = True
+SWEETS_COALESCE_TIMEOUT = 5.0
+
+# Purchases leaving this many or fewer in stock trigger a low-stock alert
+SWEETS_LOW_STOCK_THRESHOLD = 5
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
@@ -117,8 +159,23 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.serializers.RevocableTokenRefreshSerializer',
 }
 
+# Refresh token blacklist (authentication.blacklist): sizing of the in-memory
+# Bloom filter and how often, in seconds, it picks up other workers' revocations
+TOKEN_BLACKLIST_FILTER_CAPACITY = 100000
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = 0.01
+TOKEN_BLACKLIST_SYNC_INTERVAL = 1.0
+# Trailing ids re-read on each sync to catch revocations that commit late
+TOKEN_BLACKLIST_RESCAN_WINDOW = 100
+
+# Bulk user provisioning: rows per INSERT and password hashing processes
+# (None uses every CPU), and the most rows one upload may contain
+USER_IMPORT_BATCH_SIZE = 500
+USER_IMPORT_HASH_WORKERS = None
+USER_IMPORT_MAX_ROWS = 2000
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
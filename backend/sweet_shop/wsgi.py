@@ -1,5 +1,8 @@
 """
 WSGI config for sweet_shop project.
+
+With several workers, set SWEETS_SNAPSHOT_PATH so sweet list/retrieve are
+served from one memory-mapped catalog snapshot shared by every worker.
 """
 import os
 from django.core.wsgi import get_wsgi_application
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class SweetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'sweets'
\ No newline at end of file
+    name = 'sweets'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
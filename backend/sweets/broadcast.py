@@ -0,0 +1,132 @@
+# backend/sweets/broadcast.py
+import asyncio
+import threading
+from collections import OrderedDict
+from django.conf import settings
+
+
+def stock_event(sweet, deleted=False):
+    """Build the compact event pushed to stock stream subscribers"""
+    event = {
+        'id': str(sweet.id),
+        'quantity': 0 if deleted else sweet.quantity,
+        'is_in_stock': False if deleted else sweet.is_in_stock,
+        'price': str(sweet.price),
+    }
+    if deleted:
+        event['deleted'] = True
+    return event
+
+
+class Subscription:
+    """
+    Per-client bounded buffer of pending stock events.
+    
+    Events for the same sweet are coalesced so a client only ever sees the
+    latest state. A client that falls more than ``max_pending`` distinct
+    sweets behind is dropped instead of being buffered without limit.
+    """
+    
+    def __init__(self, loop, max_pending):
+        self._loop = loop
+        self._max_pending = max_pending
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._wakeup = asyncio.Event()
+        self.dropped = False
+    
+    def offer(self, event):
+        """
+        Queue an event from any thread.
+        
+        Returns:
+            bool: False once the subscriber has been dropped
+        """
+        with self._lock:
+            if self.dropped:
+                return False
+            key = event['id']
+            if key not in self._pending and len(self._pending) >= self._max_pending:
+                self.dropped = True
+                self._pending.clear()
+            else:
+                self._pending[key] = event
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # The client's event loop has gone away
+            self.dropped = True
+        return not self.dropped
+    
+    def drop(self):
+        """Drop the subscriber from any thread so it is told to resync"""
+        with self._lock:
+            self.dropped = True
+            self._pending.clear()
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass
+    
+    async def get(self, timeout=None):
+        """Wait for pending events and drain them; returns [] on timeout"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._lock:
+            self._wakeup.clear()
+            events = list(self._pending.values())
+            self._pending.clear()
+        return events
+
+
+class StockBroadcaster:
+    """
+    In-process fan-out of stock events to streaming clients.
+    
+    Each worker process has its own broadcaster, so only changes made in
+    the same process are seen; run the stream under a single ASGI process.
+    """
+    
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self._subscribers = set()
+        self._lock = threading.Lock()
+    
+    def subscribe(self):
+        """Register a subscriber bound to the running event loop"""
+        subscription = Subscription(asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+    
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+    
+    def publish(self, event):
+        """Fan an event out to every subscriber, dropping slow consumers"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if not subscription.offer(event):
+                self.unsubscribe(subscription)
+    
+    def drop_all(self):
+        """Drop every subscriber, e.g. after a change too large to stream"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscription in subscribers:
+            subscription.drop()
+
+
+broadcaster = StockBroadcaster(
+    max_pending=getattr(settings, 'SWEETS_STREAM_MAX_PENDING', 100)
+)
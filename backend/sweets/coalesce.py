@@ -0,0 +1,125 @@
+# backend/sweets/coalesce.py
+import functools
+import threading
+from django.conf import settings
+from django.http import HttpResponse
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one: the first caller
+    (the leader) computes the result and every caller that arrives while it
+    is in flight waits for and shares it. A waiter that times out, or whose
+    leader failed, computes its own result.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {'leaders': 0, 'collapsed': 0, 'timeouts': 0}
+    
+    def do(self, key, compute, timeout=None):
+        """
+        Returns:
+            tuple: (result, shared) where shared is True if another request computed it
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats['leaders'] += 1
+        
+        if leader:
+            try:
+                call.result = compute()
+            except BaseException:
+                call.failed = True
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result, False
+        
+        if not call.done.wait(timeout):
+            with self._lock:
+                self._stats['timeouts'] += 1
+            return compute(), False
+        if call.failed:
+            return compute(), False
+        with self._lock:
+            self._stats['collapsed'] += 1
+        return call.result, True
+    
+    def stats(self):
+        """Counts of leader computations, collapsed requests and wait timeouts"""
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls))
+
+
+single_flight = SingleFlight()
+
+
+def coalescing_key(view, request, kwargs):
+    """
+    Requests share a response only if they hit the same action and object
+    with the same query params, host, negotiated media type and permissions
+    """
+    params = tuple(sorted(
+        (name, tuple(request.query_params.getlist(name)))
+        for name in request.query_params
+    ))
+    permissions = tuple(type(permission).__name__ for permission in view.get_permissions())
+    return (
+        type(view).__name__,
+        view.action,
+        tuple(sorted(kwargs.items())),
+        params,
+        request.get_host(),
+        request.accepted_media_type,
+        permissions,
+    )
+
+
+def coalesce(method):
+    """
+    Share one rendered response between identical concurrent GET requests.
+    Authentication and permission checks still run for every request.
+    """
+    @functools.wraps(method)
+    def wrapper(view, request, *args, **kwargs):
+        if request.method != 'GET' or not getattr(settings, 'SWEETS_COALESCE_REQUESTS', True):
+            return method(view, request, *args, **kwargs)
+        
+        def compute():
+            response = view.finalize_response(
+                request, method(view, request, *args, **kwargs), *args, **kwargs
+            )
+            if hasattr(response, 'render'):
+                response.render()
+            return response, (response.status_code, response.content, list(response.items()))
+        
+        (response, rendered), shared = single_flight.do(
+            coalescing_key(view, request, kwargs),
+            compute,
+            getattr(settings, 'SWEETS_COALESCE_TIMEOUT', 5.0)
+        )
+        if not shared:
+            return response
+        
+        # Waiters get a copy of the leader's rendered bytes
+        status_code, content, headers = rendered
+        response = HttpResponse(content, status=status_code)
+        for header, value in headers:
+            response[header] = value
+        response['X-Coalesced'] = 'true'
+        return response
+    return wrapper
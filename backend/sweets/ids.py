@@ -0,0 +1,26 @@
+# backend/sweets/ids.py
+import os
+import time
+import uuid
+
+
+def uuid7():
+    """
+    Generate a time-ordered UUID (RFC 9562 version 7).
+    
+    The leading 48 bits are the Unix time in milliseconds and the next 12
+    bits the sub-millisecond fraction, so ids sort by creation time and new
+    rows are appended to the end of the primary-key index instead of being
+    scattered across it like uuid4.
+    """
+    nanoseconds = time.time_ns()
+    milliseconds, remainder = divmod(nanoseconds, 1_000_000)
+    sub_millisecond = remainder * 4096 // 1_000_000
+    random_bits = int.from_bytes(os.urandom(8), 'big') & ((1 << 62) - 1)
+    
+    value = (milliseconds & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76
+    value |= sub_millisecond << 64
+    value |= 0x2 << 62
+    value |= random_bits
+    return uuid.UUID(int=value)
@@ -0,0 +1,105 @@
+# backend/sweets/management/commands/benchmark_catalog_snapshot.py
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from sweets.models import Sweet
+from sweets.serializers import SweetSerializer
+from sweets.snapshot import SnapshotFile, build_snapshot
+
+
+class Command(BaseCommand):
+    """
+    Compare list/retrieve served from the ORM with the mmap catalog snapshot.
+    
+    Sample sweets are inserted inside a transaction that is rolled back, so
+    the database is left as it was.
+    """
+    help = 'Benchmark the shared catalog snapshot against the ORM path'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000)
+        parser.add_argument('--runs', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=20)
+    
+    def handle(self, *args, **options):
+        rows, runs, page_size = options['rows'], options['runs'], options['page_size']
+        renderer = JSONRenderer()
+        
+        with transaction.atomic(), tempfile.TemporaryDirectory() as scratch:
+            Sweet.objects.bulk_create(
+                [
+                    Sweet(
+                        name=f'Sweet {index}', category=f'Category {index % 50}',
+                        price=Decimal('1.99'), quantity=index % 100,
+                        description='A benchmark sweet'
+                    )
+                    for index in range(rows)
+                ],
+                batch_size=1000
+            )
+            ids = list(Sweet.objects.values_list('id', flat=True))
+            total = len(ids)
+            pages = max(1, total // page_size)
+            
+            path = os.path.join(scratch, 'catalog.snapshot')
+            started = time.perf_counter()
+            build_snapshot(path)
+            build_time = time.perf_counter() - started
+            snapshot = SnapshotFile(path)
+            
+            def orm_list():
+                start = random.randrange(pages) * page_size
+                queryset = Sweet.objects.all()
+                data = {
+                    'count': queryset.count(),
+                    'results': SweetSerializer(queryset[start:start + page_size], many=True).data
+                }
+                return renderer.render(data)
+            
+            def snapshot_list():
+                start = random.randrange(pages) * page_size
+                return b''.join([
+                    b'{"count":%d,"results":[' % snapshot.count,
+                    snapshot.page(start, start + page_size),
+                    b']}'
+                ])
+            
+            def orm_retrieve():
+                return renderer.render(SweetSerializer(Sweet.objects.get(id=random.choice(ids))).data)
+            
+            def snapshot_retrieve():
+                return bytes(snapshot.record(random.choice(ids)))
+            
+            self.stdout.write(
+                f'{total} sweets; snapshot built in {build_time:.2f}s, '
+                f'{os.path.getsize(path) / 1024 / 1024:.1f} MiB mapped and shared by all workers'
+            )
+            for label, orm_call, snapshot_call in (
+                ('list', orm_list, snapshot_list),
+                ('retrieve', orm_retrieve, snapshot_retrieve),
+            ):
+                orm_latency, orm_peak = self._measure(orm_call, runs)
+                snapshot_latency, snapshot_peak = self._measure(snapshot_call, runs)
+                self.stdout.write(
+                    f'{label}: ORM {orm_latency * 1000:.3f}ms / {orm_peak / 1024:.0f} KiB peak, '
+                    f'snapshot {snapshot_latency * 1000:.3f}ms / {snapshot_peak / 1024:.0f} KiB peak'
+                )
+            transaction.set_rollback(True)
+    
+    def _measure(self, call, runs):
+        started = time.perf_counter()
+        for _ in range(runs):
+            call()
+        latency = (time.perf_counter() - started) / runs
+        
+        tracemalloc.start()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return latency, peak
@@ -0,0 +1,92 @@
+# backend/sweets/management/commands/benchmark_sweet_keys.py
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from django.core.management.base import BaseCommand
+from sweets.ids import uuid7
+
+
+class Command(BaseCommand):
+    """
+    Compare uuid4 and uuid7 primary keys for sweets insert throughput, and
+    the default "newest first" list query with and without a created_at index.
+    
+    Runs against a scratch SQLite file shaped like the sweets table, so the
+    project database is never touched.
+    """
+    help = 'Benchmark uuid4 vs uuid7 Sweet keys and the created_at index'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--list-runs', type=int, default=50)
+    
+    def handle(self, *args, **options):
+        rows = options['rows']
+        batch_size = options['batch_size']
+        
+        with tempfile.TemporaryDirectory() as scratch:
+            for label, make_id in (('uuid4', uuid.uuid4), ('uuid7', uuid7)):
+                connection = sqlite3.connect(os.path.join(scratch, f'{label}.sqlite3'))
+                self._create_table(connection)
+                
+                started = time.perf_counter()
+                self._insert(connection, make_id, rows, batch_size)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'{label}: inserted {rows} rows in {elapsed:.2f}s '
+                    f'({rows / elapsed:,.0f} rows/s)'
+                )
+                
+                if label == 'uuid7':
+                    unindexed = self._time_list(connection, options['list_runs'])
+                    connection.execute(
+                        'CREATE INDEX sweet_created_desc ON sweet (created_at DESC)'
+                    )
+                    indexed = self._time_list(connection, options['list_runs'])
+                    self.stdout.write(
+                        f'list (ORDER BY created_at DESC LIMIT 20): '
+                        f'{unindexed * 1000:.2f}ms without index, '
+                        f'{indexed * 1000:.3f}ms with index'
+                    )
+                connection.close()
+    
+    def _create_table(self, connection):
+        # Mirrors the columns Django creates for Sweet on SQLite
+        connection.execute(
+            'CREATE TABLE sweet ('
+            ' id char(32) NOT NULL PRIMARY KEY,'
+            ' name varchar(200) NOT NULL,'
+            ' category varchar(100) NOT NULL,'
+            ' price decimal NOT NULL,'
+            ' quantity integer NOT NULL,'
+            ' description text NULL,'
+            ' created_at datetime NOT NULL,'
+            ' updated_at datetime NOT NULL)'
+        )
+    
+    def _insert(self, connection, make_id, rows, batch_size):
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for offset in range(0, rows, batch_size):
+            batch = []
+            for index in range(offset, min(offset + batch_size, rows)):
+                stamp = (start + timedelta(seconds=index)).isoformat(' ')
+                batch.append((
+                    make_id().hex, f'Sweet {index}', f'Category {index % 50}',
+                    '9.99', index % 100, None, stamp, stamp
+                ))
+            with connection:
+                connection.executemany(
+                    'INSERT INTO sweet VALUES (?, ?, ?, ?, ?, ?, ?, ?)', batch
+                )
+    
+    def _time_list(self, connection, runs):
+        started = time.perf_counter()
+        for _ in range(runs):
+            connection.execute(
+                'SELECT * FROM sweet ORDER BY created_at DESC LIMIT 20'
+            ).fetchall()
+        return (time.perf_counter() - started) / runs
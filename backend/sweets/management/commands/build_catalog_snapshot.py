@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from sweets.snapshot import refresh_snapshot
+
+
+class Command(BaseCommand):
+    """
+    Build the shared catalog snapshot out of band, e.g. on deploy so the
+    first requests are not served from the ORM, or from cron.
+    """
+    help = 'Rebuild the catalog snapshot at SWEETS_SNAPSHOT_PATH if it is stale'
+    
+    def handle(self, *args, **options):
+        path = getattr(settings, 'SWEETS_SNAPSHOT_PATH', None)
+        if not path:
+            raise CommandError('SWEETS_SNAPSHOT_PATH is not set')
+        
+        count = refresh_snapshot(path)
+        if count is None:
+            self.stdout.write('Snapshot is current or being built elsewhere')
+        else:
+            self.stdout.write(f'Wrote {count} sweet(s) to {path}')
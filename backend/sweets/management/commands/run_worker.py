@@ -0,0 +1,35 @@
+# backend/sweets/management/commands/run_worker.py
+import signal
+import time
+from django.core.management.base import BaseCommand
+from sweets.taskqueue import process_durable_tasks
+
+
+class Command(BaseCommand):
+    help = 'Run durable background tasks from the QueuedTask table'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when no task is due')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--once', action='store_true',
+                            help='Process due tasks once and exit')
+    
+    def handle(self, *args, **options):
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        
+        while not self._stopping:
+            processed = process_durable_tasks(limit=options['batch_size'])
+            if processed:
+                self.stdout.write(f'Processed {processed} task(s)')
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['poll_interval'])
+        self.stdout.write('Worker stopped')
+    
+    def _stop(self, signum, frame):
+        # Finish the current task, then exit the loop
+        self._stopping = True
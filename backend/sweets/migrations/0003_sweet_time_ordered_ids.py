@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:50
+
+from django.db import migrations, models
+import sweets.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sweets', '0002_sweet_sync'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sweet',
+            name='id',
+            field=models.UUIDField(default=sweets.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AddIndex(
+            model_name='sweet',
+            index=models.Index(fields=['-created_at'], name='sweets_swee_created_288289_idx'),
+        ),
+    ]
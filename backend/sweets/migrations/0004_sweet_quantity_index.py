@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sweets', '0003_sweet_time_ordered_ids'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sweet',
+            index=models.Index(fields=['quantity'], name='sweets_swee_quantit_843f2e_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sweets', '0004_sweet_quantity_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sweet',
+            index=models.Index(condition=models.Q(('quantity__gt', 0)), fields=['category', 'price'], name='sweet_in_stock_cat_price_idx'),
+        ),
+    ]
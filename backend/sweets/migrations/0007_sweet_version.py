@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 20:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sweets', '0006_queuedtask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sweet',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
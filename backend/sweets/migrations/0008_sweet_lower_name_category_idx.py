@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 20:20
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sweets', '0007_sweet_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sweet',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='sweet_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sweet',
+            index=models.Index(django.db.models.functions.text.Lower('category'), name='sweet_category_lower_idx'),
+        ),
+    ]
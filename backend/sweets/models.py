@@ -1,14 +1,18 @@
 # backend/sweets/models.py
-import uuid
-from django.db import models
+from django.db import models, router
+from django.db.models import F
+from django.db.models.functions import Lower
+from django.db.models.signals import post_save
 from django.core.validators import MinValueValidator
 from decimal import Decimal
+from django.utils import timezone
+from .ids import uuid7
 
 class Sweet(models.Model):
     """
     Model representing a sweet/candy item in the shop.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     name = models.CharField(max_length=200)
     category = models.CharField(max_length=100)
     price = models.DecimalField(
@@ -20,6 +24,7 @@ class Sweet(models.Model):
         validators=[MinValueValidator(0)]
     )
     description = models.TextField(blank=True, null=True)
+    version = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -28,11 +33,64 @@ class Sweet(models.Model):
         indexes = [
             models.Index(fields=['name']),
             models.Index(fields=['category']),
+            models.Index(Lower('name'), name='sweet_name_lower_idx'),
+            models.Index(Lower('category'), name='sweet_category_lower_idx'),
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['quantity']),
+            models.Index(
+                fields=['category', 'price'],
+                condition=models.Q(quantity__gt=0),
+                name='sweet_in_stock_cat_price_idx'
+            ),
         ]
     
     def __str__(self):
         return self.name
     
+    def save(self, *args, **kwargs):
+        """Bump the version on every write of an existing sweet"""
+        if not self._state.adding:
+            self.version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version', 'updated_at'}
+        super().save(*args, **kwargs)
+    
+    def apply_update(self, conditions=None, **values):
+        """
+        Write the given columns with a single conditional
+        UPDATE ... WHERE id = ? [AND conditions], bumping version and updated_at.
+        No row lock is taken; a concurrent change simply makes the WHERE miss.
+        
+        On success the written fields are reloaded and post_save is sent with
+        update_fields, so signal listeners see the change.
+        
+        Args:
+            conditions (dict): Extra filter the row must still match
+            **values: Column values or expressions to write
+            
+        Returns:
+            bool: False if the row no longer matched the conditions
+        """
+        values['version'] = F('version') + 1
+        values.setdefault('updated_at', timezone.now())
+        matched = Sweet.objects.filter(pk=self.pk, **(conditions or {})).update(**values)
+        if not matched:
+            return False
+        
+        fields = list(values)
+        self.refresh_from_db(fields=fields)
+        post_save.send(
+            sender=Sweet,
+            instance=self,
+            created=False,
+            update_fields=frozenset(fields),
+            raw=False,
+            using=router.db_for_write(Sweet, instance=self)
+        )
+        return True
+    
     def purchase(self, amount):
         """
         Decrease the quantity when a sweet is purchased.
@@ -41,16 +99,18 @@ class Sweet(models.Model):
             amount (int): Number of items to purchase
             
         Raises:
-            ValueError: If insufficient stock or invalid amount
+            ValueError: If insufficient stock, invalid amount or the sweet
+                has been deleted
         """
         if amount <= 0:
             raise ValueError("Purchase amount must be positive")
         
-        if self.quantity < amount:
+        if not self.apply_update({'quantity__gte': amount}, quantity=F('quantity') - amount):
+            try:
+                self.refresh_from_db(fields=['quantity'])
+            except Sweet.DoesNotExist:
+                raise ValueError("Sweet is no longer available.")
             raise ValueError(f"Insufficient stock. Only {self.quantity} available.")
-        
-        self.quantity -= amount
-        self.save()
     
     def restock(self, amount):
         """
@@ -65,10 +125,60 @@ class Sweet(models.Model):
         if amount <= 0:
             raise ValueError("Restock amount must be positive")
         
-        self.quantity += amount
-        self.save()
+        self.apply_update(quantity=F('quantity') + amount)
     
     @property
     def is_in_stock(self):
         """Check if the sweet is currently in stock"""
-        return self.quantity > 0
\ No newline at end of file
+        return self.quantity > 0
+
+
+class DeletedSweet(models.Model):
+    """
+    Tombstone recorded when a sweet is deleted, so clients syncing
+    incrementally via /api/sweets/changes/ learn about the removal.
+    """
+    sweet_id = models.UUIDField(unique=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['deleted_at']
+    
+    def __str__(self):
+        return str(self.sweet_id)
+
+
+
+class QueuedTask(models.Model):
+    """
+    Durable background task, written in the same transaction as the change
+    that caused it and consumed by ``manage.py run_worker``.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (FAILED, 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=1)
+    run_after = models.DateTimeField()
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+    
+    def __str__(self):
+        return f'{self.name} ({self.status})'
@@ -1,4 +1,5 @@
 # backend/sweets/serializers.py
+from django.conf import settings
 from rest_framework import serializers
 from .models import Sweet
 
@@ -10,9 +11,9 @@ class SweetSerializer(serializers.ModelSerializer):
         model = Sweet
         fields = [
             'id', 'name', 'category', 'price', 'quantity',
-            'description', 'is_in_stock', 'created_at', 'updated_at'
+            'description', 'is_in_stock', 'version', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'version', 'created_at', 'updated_at']
     
     def validate_price(self, value):
         """Ensure price is positive"""
@@ -46,4 +47,22 @@ class RestockSerializer(serializers.Serializer):
         """Validate restock amount"""
         if value <= 0:
             raise serializers.ValidationError("Restock amount must be positive")
-        return value
\ No newline at end of file
+        return value
+
+
+class SweetBatchSerializer(serializers.Serializer):
+    """Serializer for fetching several sweets by id in one request"""
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False
+    )
+    
+    def validate_ids(self, value):
+        """Drop duplicate ids (keeping the caller's order) and enforce the batch limit"""
+        max_size = getattr(settings, 'SWEETS_BATCH_MAX_SIZE', 100)
+        unique_ids = list(dict.fromkeys(value))
+        if len(unique_ids) > max_size:
+            raise serializers.ValidationError(
+                f"A batch may contain at most {max_size} ids"
+            )
+        return unique_ids
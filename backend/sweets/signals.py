@@ -0,0 +1,47 @@
+# backend/sweets/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .broadcast import broadcaster, stock_event
+from .models import Sweet, DeletedSweet
+from .suggest import suggest_index
+
+@receiver(post_delete, sender=Sweet)
+def record_sweet_tombstone(sender, instance, **kwargs):
+    """Leave a tombstone behind so delta sync clients can drop the sweet"""
+    DeletedSweet.objects.update_or_create(
+        sweet_id=instance.id,
+        defaults={'deleted_at': timezone.now()}
+    )
+
+
+@receiver(post_save, sender=Sweet)
+def broadcast_sweet_saved(sender, instance, **kwargs):
+    """Push the new stock level to stream subscribers once committed"""
+    event = stock_event(instance)
+    transaction.on_commit(lambda: broadcaster.publish(event))
+
+
+@receiver(post_delete, sender=Sweet)
+def broadcast_sweet_deleted(sender, instance, **kwargs):
+    """Tell stream subscribers the sweet is gone once committed"""
+    event = stock_event(instance, deleted=True)
+    transaction.on_commit(lambda: broadcaster.publish(event))
+
+
+
+@receiver(post_save, sender=Sweet)
+def index_sweet_saved(sender, instance, update_fields=None, **kwargs):
+    """Keep the typeahead index in step with new and renamed sweets"""
+    if update_fields is not None and not {'name', 'category'} & set(update_fields):
+        return
+    sweet_id, name, category = instance.id, instance.name, instance.category
+    transaction.on_commit(lambda: suggest_index.update(sweet_id, name, category))
+
+
+@receiver(post_delete, sender=Sweet)
+def unindex_sweet_deleted(sender, instance, **kwargs):
+    """Drop deleted sweets from the typeahead index"""
+    sweet_id = instance.id
+    transaction.on_commit(lambda: suggest_index.remove(sweet_id))
@@ -0,0 +1,267 @@
+# backend/sweets/snapshot.py
+"""
+Read-only catalog snapshot shared by all worker processes through mmap.
+
+File layout (native byte order, so the offset arrays map without copying):
+    header   magic (8s) | catalog version (Q) | record count (Q)
+    offsets  count + 1 x Q: start of each record in the data section,
+             in list order (-created_at); the last entry is the data length
+    ids      count x 16s: record UUIDs sorted by their bytes
+    rows     count x I: list position of each sorted UUID
+    data     pre-rendered JSON records, each followed by a comma
+
+A page of the list is therefore one contiguous slice of the data section.
+
+Rebuilds never run on the request path: a stale snapshot keeps being served
+while a background task (or ``manage.py build_catalog_snapshot``) writes the
+new file, with a lock file making sure only one process builds at a time.
+"""
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from datetime import timedelta
+from mmap import ACCESS_READ, mmap
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from .models import Sweet, DeletedSweet
+from .serializers import SweetSerializer
+from .taskqueue import task
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are not coordinated across processes
+    fcntl = None
+
+MAGIC = b'SWSNAP1\x00'
+HEADER = struct.Struct('=8sQQ')
+
+
+def catalog_version():
+    """
+    Fingerprint of the catalog from index range lookups: every create/update
+    bumps updated_at and version, and every delete leaves a tombstone.
+    
+    The stamps are taken before commit, so a write committing after a newer
+    one leaves the MAX unchanged. The count and version sum of rows stamped
+    within the last SWEETS_SYNC_SAFETY_LAG seconds are folded in to catch
+    those late commits; as rows age out of that window the fingerprint
+    changes once more, costing one extra rebuild after a burst of writes.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'SWEETS_SYNC_SAFETY_LAG', 5))
+    updates = Sweet.objects.order_by().aggregate(latest=Max('updated_at'))
+    recent = Sweet.objects.filter(updated_at__gt=cutoff).order_by().aggregate(
+        count=Count('id'), versions=Sum('version')
+    )
+    deletes = DeletedSweet.objects.order_by().aggregate(latest=Max('deleted_at'))
+    recent_deletes = DeletedSweet.objects.filter(deleted_at__gt=cutoff).count()
+    fingerprint = (
+        f"{updates['latest']}|{recent['count']}|{recent['versions']}|"
+        f"{deletes['latest']}|{recent_deletes}"
+    )
+    digest = hashlib.blake2b(fingerprint.encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), 'little')
+
+
+def build_snapshot(path, version=None):
+    """
+    Write a snapshot of the catalog and atomically move it into place.
+    
+    Returns:
+        int: Number of records written
+    """
+    if version is None:
+        version = catalog_version()
+    renderer = JSONRenderer()
+    # One serializer reused for every row; building fields per row dominates
+    serializer = SweetSerializer()
+    
+    offsets = [0]
+    ids = []
+    chunks = []
+    for sweet in Sweet.objects.all().iterator(chunk_size=2000):
+        record = renderer.render(serializer.to_representation(sweet)) + b','
+        chunks.append(record)
+        offsets.append(offsets[-1] + len(record))
+        ids.append(sweet.id.bytes)
+    
+    count = len(ids)
+    order = sorted(range(count), key=ids.__getitem__)
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix='.catalog-', suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as output:
+            output.write(HEADER.pack(MAGIC, version, count))
+            output.write(array('Q', offsets).tobytes())
+            output.write(b''.join(ids[position] for position in order))
+            output.write(array('I', order).tobytes())
+            output.writelines(chunks)
+            output.flush()
+            os.fsync(output.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return count
+
+
+def _file_version(path):
+    """Catalog version recorded in a snapshot file, or None if unreadable"""
+    try:
+        with open(path, 'rb') as handle:
+            header = handle.read(HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, version, _ = HEADER.unpack(header)
+    return version if magic == MAGIC else None
+
+
+def refresh_snapshot(path):
+    """
+    Rebuild the snapshot if it is behind the catalog, in at most one process.
+    
+    Takes an exclusive lock on ``<path>.lock`` without waiting; if another
+    process holds it, that process is already building. Once locked the
+    version on disk is checked again, since the file may have been rebuilt
+    while this call was queued.
+    
+    Returns:
+        int: Number of records written, or None if no build was needed
+    """
+    path = str(path)
+    with open(path + '.lock', 'a') as lock:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+        version = catalog_version()
+        if _file_version(path) == version:
+            return None
+        return build_snapshot(path, version)
+
+
+@task(retries=0)
+def rebuild_catalog_snapshot(path):
+    """Background rebuild requested by a stale CatalogSnapshot"""
+    refresh_snapshot(path)
+
+
+class SnapshotFile:
+    """A mapped snapshot file; slices are views into the shared mapping"""
+    
+    def __init__(self, path):
+        with open(path, 'rb') as handle:
+            self.identity = os.fstat(handle.fileno()).st_ino
+            self._map = mmap(handle.fileno(), 0, access=ACCESS_READ)
+        magic, self.version, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a catalog snapshot')
+        
+        view = memoryview(self._map)
+        start = HEADER.size
+        self._offsets = view[start:start + (self.count + 1) * 8].cast('Q')
+        start += (self.count + 1) * 8
+        self._ids_start = start
+        start += self.count * 16
+        self._rows = view[start:start + self.count * 4].cast('I')
+        start += self.count * 4
+        self._data = view[start:]
+    
+    def _id_at(self, index):
+        start = self._ids_start + index * 16
+        return self._map[start:start + 16]
+    
+    def page(self, start, stop):
+        """Comma-joined JSON records [start, stop) in list order"""
+        stop = min(stop, self.count)
+        if start >= stop:
+            return b''
+        return self._data[self._offsets[start]:self._offsets[stop] - 1]
+    
+    def record(self, sweet_id):
+        """JSON record for a sweet id, or None"""
+        target = sweet_id.bytes
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._id_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._id_at(low) == target:
+            position = self._rows[low]
+            return self._data[self._offsets[position]:self._offsets[position + 1] - 1]
+        return None
+
+
+class CatalogSnapshot:
+    """
+    Per-process handle on the shared snapshot. At most every
+    ``check_interval`` seconds it remaps the file if it was replaced and
+    compares the catalog version with the snapshot's; if stale it queues a
+    background rebuild and keeps serving the mapping it has. Until a first
+    snapshot exists ``get`` returns None and callers use the ORM.
+    """
+    
+    def __init__(self, path, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._checked_at = None
+        self._requested_version = None
+    
+    def _remap_if_replaced(self):
+        try:
+            identity = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            self._file = None
+            return
+        if self._file is None or self._file.identity != identity:
+            self._file = SnapshotFile(self.path)
+    
+    def get(self):
+        """The current snapshot file, possibly stale, or None"""
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return self._file
+            self._checked_at = now
+            
+            self._remap_if_replaced()
+            version = catalog_version()
+            stale = self._file is None or self._file.version != version
+            if stale and self._requested_version != version:
+                self._requested_version = version
+                rebuild_catalog_snapshot.delay(self.path)
+                self._remap_if_replaced()
+            return self._file
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_catalog_snapshot():
+    """
+    The snapshot for SWEETS_SNAPSHOT_PATH, or None when snapshots are disabled
+    """
+    path = getattr(settings, 'SWEETS_SNAPSHOT_PATH', None)
+    if not path:
+        return None
+    path = str(path)
+    with _snapshots_lock:
+        if path not in _snapshots:
+            _snapshots[path] = CatalogSnapshot(
+                path, getattr(settings, 'SWEETS_SNAPSHOT_CHECK_INTERVAL', 2.0)
+            )
+        return _snapshots[path].get()
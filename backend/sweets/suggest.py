@@ -0,0 +1,195 @@
+# backend/sweets/suggest.py
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+from django.conf import settings
+from django.db.models.functions import Lower
+from .models import Sweet, DeletedSweet
+
+MAX_KEY_LENGTH = 64
+MAX_WORDS_PER_NAME = 4
+
+
+def index_keys(name, category):
+    """Normalized prefixes a sweet should be found under"""
+    words = name.casefold().split()
+    keys = {' '.join(words[position:]) for position in range(min(len(words), MAX_WORDS_PER_NAME))}
+    keys.add(category.casefold())
+    return {key[:MAX_KEY_LENGTH] for key in keys if key}
+
+
+class PrefixIndex:
+    """
+    In-process typeahead index: a sorted array of (key, sweet id) pairs
+    searched with bisect. Each sweet is indexed under its name, the later
+    words of its name and its category.
+    
+    The index is built lazily on first use, kept current by Sweet signals
+    for writes made in this process, and picks up writes made by other
+    processes from updated_at/tombstones every ``refresh_interval`` seconds.
+    Those stamps are taken before commit, so each refresh re-reads the last
+    ``safety_lag`` seconds before its watermark to catch late commits.
+    Past ``max_entries`` keys it marks itself incomplete and lookups fall
+    back to the database.
+    """
+    
+    def __init__(self, max_entries=200000, refresh_interval=5.0, safety_lag=5):
+        self.max_entries = max_entries
+        self.refresh_interval = refresh_interval
+        self.safety_lag = safety_lag
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Drop the index; it is rebuilt on next use"""
+        with self._lock:
+            self._entries = []
+            self._keys_by_id = {}
+            self._names = {}
+            self._built = False
+            self.complete = True
+            self._watermark = None
+            self._refreshed_at = 0.0
+    
+    def _add(self, sweet_id, name, category):
+        keys = index_keys(name, category)
+        if self._keys_by_id.get(sweet_id) == keys and self._names.get(sweet_id) == name:
+            return
+        self._remove(sweet_id)
+        if len(self._entries) + len(keys) > self.max_entries:
+            self.complete = False
+            return
+        for key in keys:
+            insort(self._entries, (key, sweet_id))
+        self._keys_by_id[sweet_id] = keys
+        self._names[sweet_id] = name
+    
+    def _remove(self, sweet_id):
+        for key in self._keys_by_id.pop(sweet_id, ()):
+            position = bisect_left(self._entries, (key, sweet_id))
+            if position < len(self._entries) and self._entries[position] == (key, sweet_id):
+                del self._entries[position]
+        self._names.pop(sweet_id, None)
+    
+    def _track(self, updated_at):
+        if self._watermark is None or updated_at > self._watermark:
+            self._watermark = updated_at
+    
+    def _build(self):
+        entries = []
+        self._keys_by_id = {}
+        self._names = {}
+        self.complete = True
+        self._watermark = None
+        rows = Sweet.objects.order_by().values_list('id', 'name', 'category', 'updated_at')
+        for sweet_id, name, category, updated_at in rows.iterator():
+            self._track(updated_at)
+            sweet_id = str(sweet_id)
+            keys = index_keys(name, category)
+            if len(entries) + len(keys) > self.max_entries:
+                self.complete = False
+                continue
+            entries.extend((key, sweet_id) for key in keys)
+            self._keys_by_id[sweet_id] = keys
+            self._names[sweet_id] = name
+        entries.sort()
+        self._entries = entries
+        self._built = True
+    
+    def _refresh(self):
+        """Apply writes made by other processes since the last look"""
+        changed = Sweet.objects.order_by()
+        deleted = DeletedSweet.objects.order_by()
+        if self._watermark is not None:
+            since = self._watermark - timedelta(seconds=self.safety_lag)
+            changed = changed.filter(updated_at__gt=since)
+            deleted = deleted.filter(deleted_at__gt=since)
+        for sweet_id, name, category, updated_at in changed.values_list(
+            'id', 'name', 'category', 'updated_at'
+        ):
+            self._track(updated_at)
+            self._add(str(sweet_id), name, category)
+        for sweet_id, deleted_at in deleted.values_list('sweet_id', 'deleted_at'):
+            self._track(deleted_at)
+            self._remove(str(sweet_id))
+    
+    def _ensure_current(self):
+        now = time.monotonic()
+        if not self._built:
+            self._build()
+        elif now - self._refreshed_at >= self.refresh_interval:
+            self._refresh()
+        else:
+            return
+        self._refreshed_at = now
+    
+    def update(self, sweet_id, name, category):
+        """Index a created or renamed sweet"""
+        with self._lock:
+            if self._built:
+                self._add(str(sweet_id), name, category)
+    
+    def remove(self, sweet_id):
+        """Forget a deleted sweet"""
+        with self._lock:
+            if self._built:
+                self._remove(str(sweet_id))
+    
+    def suggest(self, query, limit=10):
+        """
+        Top ``limit`` sweets whose name, a word of their name or their
+        category starts with ``query`` (case-insensitive).
+        
+        Returns:
+            list: [{'id': ..., 'name': ...}, ...]
+        """
+        prefix = query.strip().casefold()[:MAX_KEY_LENGTH]
+        if not prefix:
+            return []
+        
+        with self._lock:
+            self._ensure_current()
+            if self.complete:
+                results = []
+                seen = set()
+                position = bisect_left(self._entries, (prefix,))
+                while position < len(self._entries) and len(results) < limit:
+                    key, sweet_id = self._entries[position]
+                    if not key.startswith(prefix):
+                        break
+                    if sweet_id not in seen:
+                        seen.add(sweet_id)
+                        results.append({'id': sweet_id, 'name': self._names[sweet_id]})
+                    position += 1
+                return results
+        
+        return self._suggest_from_database(prefix, limit)
+    
+    def _suggest_from_database(self, prefix, limit):
+        """
+        Fallback once the index is over capacity: range scans on the
+        LOWER(name) then LOWER(category) indexes, each stopping after
+        ``limit`` rows. Later words of a name are not matched here.
+        """
+        upper = prefix + '\U0010ffff'
+        results = {}
+        for field in ('name', 'category'):
+            matches = (
+                Sweet.objects.alias(key=Lower(field))
+                .filter(key__gte=prefix, key__lt=upper)
+                .order_by('key')
+                .values_list('id', 'name')[:limit]
+            )
+            for sweet_id, name in matches:
+                results.setdefault(str(sweet_id), name)
+            if len(results) >= limit:
+                break
+        return [{'id': sweet_id, 'name': name} for sweet_id, name in list(results.items())[:limit]]
+
+
+suggest_index = PrefixIndex(
+    max_entries=getattr(settings, 'SWEETS_SUGGEST_MAX_ENTRIES', 200000),
+    refresh_interval=getattr(settings, 'SWEETS_SUGGEST_REFRESH_INTERVAL', 5.0),
+    safety_lag=getattr(settings, 'SWEETS_SYNC_SAFETY_LAG', 5),
+)
@@ -0,0 +1,232 @@
+# backend/sweets/taskqueue.py
+"""
+Lightweight background tasks for work that should not hold up a request.
+
+    @task(retries=3)
+    def send_receipt(order_id):
+        ...
+
+    send_receipt.delay(order_id)
+
+``delay`` queues the call once the current transaction commits and a
+bounded pool of worker threads runs it, retrying failures with exponential
+backoff. Tasks declared with ``durable=True`` are instead stored in the
+QueuedTask table inside the current transaction and run by
+``manage.py run_worker``. With TASKS_ALWAYS_SYNC every task runs inline
+when the transaction commits, which is what the tests use.
+"""
+import atexit
+import functools
+import logging
+import queue
+import threading
+import time
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import QueuedTask
+
+logger = logging.getLogger(__name__)
+
+
+class Task:
+    """A function that can be run in the background via ``delay``"""
+    
+    def __init__(self, func, retries=3, backoff=0.5, durable=False):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.retries = retries
+        self.backoff = backoff
+        self.durable = durable
+    
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+    
+    def delay(self, *args, **kwargs):
+        """Schedule the task; arguments must be JSON serializable for durable tasks"""
+        if self.durable and not getattr(settings, 'TASKS_ALWAYS_SYNC', False):
+            QueuedTask.objects.create(
+                name=self.name,
+                args=list(args),
+                kwargs=kwargs,
+                max_attempts=self.retries + 1,
+                run_after=timezone.now()
+            )
+            return
+        transaction.on_commit(lambda: task_pool.submit(self, args, kwargs))
+    
+    def backoff_for(self, attempt):
+        """Seconds to wait after the given (1-based) failed attempt"""
+        return self.backoff * 2 ** (attempt - 1)
+    
+    def run_with_retries(self, args, kwargs, sleep=time.sleep):
+        """
+        Run the task, retrying with backoff.
+        
+        Raises:
+            Exception: The last error once every attempt has failed
+        """
+        for attempt in range(1, self.retries + 2):
+            try:
+                return self.func(*args, **kwargs)
+            except Exception:
+                if attempt > self.retries:
+                    raise
+                logger.warning('Task %s failed (attempt %d), retrying', self.name, attempt)
+                sleep(self.backoff_for(attempt))
+
+
+def task(func=None, *, retries=3, backoff=0.5, durable=False):
+    """Decorator turning a function into a background Task"""
+    def wrap(inner):
+        return Task(inner, retries=retries, backoff=backoff, durable=durable)
+    return wrap(func) if func is not None else wrap
+
+
+class TaskPool:
+    """
+    Bounded pool of worker threads. When the queue is full the caller runs
+    the task itself, which slows the producer instead of growing memory.
+    """
+    
+    def __init__(self, workers=4, max_queue=1000):
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._closed = False
+    
+    def _start(self):
+        with self._lock:
+            if self._threads or self._closed:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f'sweets-task-{index}', daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            atexit.register(self.shutdown)
+    
+    def _run(self, item):
+        task_obj, args, kwargs = item
+        try:
+            task_obj.run_with_retries(args, kwargs)
+        except Exception:
+            logger.exception('Task %s failed permanently', task_obj.name)
+        finally:
+            close_old_connections()
+    
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._run(item)
+            finally:
+                self._queue.task_done()
+    
+    def submit(self, task_obj, args=(), kwargs=None):
+        kwargs = kwargs or {}
+        if getattr(settings, 'TASKS_ALWAYS_SYNC', False):
+            task_obj.run_with_retries(args, kwargs, sleep=lambda seconds: None)
+            return
+        
+        self._start()
+        if self._closed:
+            self._run((task_obj, args, kwargs))
+            return
+        try:
+            self._queue.put_nowait((task_obj, args, kwargs))
+        except queue.Full:
+            logger.warning('Task queue full, running %s inline', task_obj.name)
+            self._run((task_obj, args, kwargs))
+    
+    def drain(self):
+        """Block until every queued task has finished"""
+        self._queue.join()
+    
+    def shutdown(self, timeout=30):
+        """Finish queued tasks, then stop the workers"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._queue.put(None)
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(0, deadline - time.monotonic()))
+
+
+task_pool = TaskPool(
+    workers=getattr(settings, 'TASKS_WORKERS', 4),
+    max_queue=getattr(settings, 'TASKS_MAX_QUEUE', 1000)
+)
+
+
+def _claim_next(lease):
+    """Claim the oldest runnable durable task, or return None"""
+    now = timezone.now()
+    runnable = QueuedTask.objects.filter(
+        Q(status=QueuedTask.PENDING, run_after__lte=now) |
+        Q(status=QueuedTask.RUNNING, claimed_at__lt=now - timedelta(seconds=lease))
+    ).order_by('id')
+    for candidate in runnable.values_list('id', 'status', 'claimed_at')[:10]:
+        task_id, task_status, claimed_at = candidate
+        # Only one worker can win the conditional UPDATE for a given row
+        claimed = QueuedTask.objects.filter(
+            id=task_id, status=task_status, claimed_at=claimed_at
+        ).update(status=QueuedTask.RUNNING, claimed_at=now)
+        if claimed:
+            return QueuedTask.objects.get(id=task_id)
+    return None
+
+
+def run_durable_task(queued):
+    """Run one claimed durable task, then delete, reschedule or fail it"""
+    queued.attempts += 1
+    task_obj = None
+    try:
+        task_obj = import_string(queued.name)
+        task_obj.func(*queued.args, **queued.kwargs)
+    except Exception:
+        queued.last_error = traceback.format_exc()
+        backoff = task_obj.backoff_for(queued.attempts) if isinstance(task_obj, Task) else 0
+        if queued.attempts >= queued.max_attempts:
+            queued.status = QueuedTask.FAILED
+            logger.error('Durable task %s failed permanently', queued.name)
+        else:
+            queued.status = QueuedTask.PENDING
+            queued.run_after = timezone.now() + timedelta(seconds=backoff)
+        queued.claimed_at = None
+        queued.save(update_fields=['attempts', 'status', 'run_after', 'claimed_at', 'last_error'])
+        return False
+    queued.delete()
+    return True
+
+
+def process_durable_tasks(limit=100, lease=None):
+    """
+    Run up to ``limit`` durable tasks that are due.
+    
+    Returns:
+        int: Number of tasks attempted
+    """
+    if lease is None:
+        lease = getattr(settings, 'TASKS_LEASE_SECONDS', 300)
+    processed = 0
+    while processed < limit:
+        queued = _claim_next(lease)
+        if queued is None:
+            break
+        run_durable_task(queued)
+        processed += 1
+    return processed
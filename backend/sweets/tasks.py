@@ -0,0 +1,16 @@
+# backend/sweets/tasks.py
+import logging
+from django.conf import settings
+from .models import Sweet
+from .taskqueue import task
+
+logger = logging.getLogger(__name__)
+
+
+@task(retries=2)
+def notify_low_stock(sweet_id):
+    """Alert staff when a sweet falls to the low-stock threshold"""
+    threshold = getattr(settings, 'SWEETS_LOW_STOCK_THRESHOLD', 5)
+    sweet = Sweet.objects.filter(id=sweet_id).only('name', 'quantity').first()
+    if sweet is not None and sweet.quantity <= threshold:
+        logger.warning('Sweet "%s" is low on stock: %d left', sweet.name, sweet.quantity)
@@ -1,8 +1,16 @@
+import asyncio
 import pytest
+from asgiref.sync import async_to_sync
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth import get_user_model
+from sweets.broadcast import broadcaster
 from sweets.models import Sweet
+from sweet_shop.asgi import application
 from decimal import Decimal
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
 
 User = get_user_model()
 
@@ -25,19 +33,6 @@ def create_admin_user(db):
         return user
     return make_admin
 
-@pytest.fixture
-def create_sweet(db):
-    def make_sweet(**kwargs):
-        defaults = {
-            'name': 'Test Sweet',
-            'category': 'Test',
-            'price': Decimal('10.00'),
-            'quantity': 50
-        }
-        defaults.update(kwargs)
-        return Sweet.objects.create(**defaults)
-    return make_sweet
-
 @pytest.mark.django_db
 class TestAuthenticationViews:
     
@@ -67,6 +62,53 @@ class TestAuthenticationViews:
         data = {'username': 'testuser', 'password': 'wrongpass'}
         response = api_client.post('/api/auth/login/', data)
         assert response.status_code == 401
+    
+    def test_rotated_refresh_token_is_revoked(self, api_client, create_user):
+        """Test a refresh token cannot be reused after rotation"""
+        create_user(username='testuser', email='test@example.com', password='testpass123')
+        login = api_client.post('/api/auth/login/', {'username': 'testuser', 'password': 'testpass123'})
+        refresh = login.data['tokens']['refresh']
+        
+        response = api_client.post('/api/auth/token/refresh/', {'refresh': refresh})
+        assert response.status_code == 200
+        assert response.data['refresh'] != refresh
+        
+        response = api_client.post('/api/auth/token/refresh/', {'refresh': refresh})
+        assert response.status_code == 401
+    
+    def test_import_users_as_admin(self, api_client, create_admin_user, settings):
+        """Test admin can provision users in bulk from NDJSON"""
+        settings.USER_IMPORT_HASH_WORKERS = 1
+        admin = create_admin_user(username='admin', email='admin@test.com', password='admin123')
+        api_client.force_authenticate(user=admin)
+        body = (
+            '{"username": "ann", "email": "ann@example.com", "password": "Sweet-pass-123"}\n'
+            '{"username": "bob", "email": "bob@example.com", "password": "123"}\n'
+        )
+        response = api_client.generic('POST', '/api/auth/users/import/', body, content_type='application/x-ndjson')
+        assert response.status_code == 200
+        assert response.data['created'] == 1
+        assert response.data['errors'][0]['row'] == 2
+    
+    def test_import_users_over_row_cap(self, api_client, create_admin_user, settings):
+        """Test uploads with more rows than the cap are refused before importing"""
+        settings.USER_IMPORT_MAX_ROWS = 1
+        admin = create_admin_user(username='admin', email='admin@test.com', password='admin123')
+        api_client.force_authenticate(user=admin)
+        body = (
+            '{"username": "ann", "email": "ann@example.com", "password": "Sweet-pass-123"}\n'
+            '{"username": "bob", "email": "bob@example.com", "password": "Sweet-pass-123"}\n'
+        )
+        response = api_client.generic('POST', '/api/auth/users/import/', body, content_type='application/x-ndjson')
+        assert response.status_code == 413
+        assert not get_user_model().objects.filter(username='ann').exists()
+    
+    def test_import_users_as_regular_user(self, api_client, create_user):
+        """Test regular user cannot provision users"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        api_client.force_authenticate(user=user)
+        response = api_client.generic('POST', '/api/auth/users/import/', '', content_type='text/csv')
+        assert response.status_code == 403
 
 @pytest.mark.django_db
 class TestSweetViews:
@@ -123,6 +165,28 @@ class TestSweetViews:
         assert len(response.data) == 1
         assert response.data[0]['name'] == 'Chocolate Bar'
     
+    def test_search_in_stock_sorted_by_price(self, api_client, create_user, create_sweet):
+        """Test searching in-stock sweets of a category ordered by price"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        create_sweet(name='Dear Truffle', category='Chocolate', price=Decimal('9.00'))
+        create_sweet(name='Cheap Bar', category='Chocolate', price=Decimal('1.50'))
+        create_sweet(name='Sold Out', category='Chocolate', price=Decimal('3.00'), quantity=0)
+        create_sweet(name='Gummy Bears', category='Gummy', price=Decimal('2.00'))
+        api_client.force_authenticate(user=user)
+        response = api_client.get('/api/sweets/search/', {
+            'category_exact': 'Chocolate', 'in_stock': 'true', 'ordering': 'price'
+        })
+        assert response.status_code == 200
+        assert [s['name'] for s in response.data] == ['Cheap Bar', 'Dear Truffle']
+    
+    def test_search_rejects_invalid_parameters(self, api_client, create_user):
+        """Test invalid price, stock and ordering values are rejected"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        api_client.force_authenticate(user=user)
+        for params in ({'min_price': 'abc'}, {'max_price': 'NaN'}, {'in_stock': 'maybe'}, {'ordering': 'quantity'}):
+            response = api_client.get('/api/sweets/search/', params)
+            assert response.status_code == 400
+    
     def test_purchase_sweet(self, api_client, create_user, create_sweet):
         """Test purchasing a sweet decreases quantity"""
         user = create_user(username='testuser', email='test@example.com', password='testpass123')
@@ -141,6 +205,16 @@ class TestSweetViews:
         response = api_client.post(f'/api/sweets/{sweet.id}/purchase/', {'amount': 10})
         assert response.status_code == 400
     
+    def test_purchase_to_low_stock_triggers_alert(self, api_client, create_user, create_sweet, caplog, django_capture_on_commit_callbacks):
+        """Test a purchase leaving little stock queues a low-stock alert"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        sweet = create_sweet(name='Rare Truffle', quantity=6)
+        api_client.force_authenticate(user=user)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(f'/api/sweets/{sweet.id}/purchase/', {'amount': 3})
+        assert response.status_code == 200
+        assert 'Rare Truffle' in caplog.text
+    
     def test_restock_sweet_as_admin(self, api_client, create_admin_user, create_sweet):
         """Test admin can restock sweets"""
         admin = create_admin_user(username='admin', email='admin@test.com', password='admin123')
@@ -166,4 +240,257 @@ class TestSweetViews:
         api_client.force_authenticate(user=admin)
         response = api_client.delete(f'/api/sweets/{sweet.id}/')
         assert response.status_code == 204
-        assert Sweet.objects.filter(id=sweet.id).count() == 0
\ No newline at end of file
+        assert Sweet.objects.filter(id=sweet.id).count() == 0
+
+@pytest.mark.django_db
+class TestSweetBatchView:
+    
+    def test_batch_get_preserves_order_and_reports_missing(self, api_client, create_user, create_sweet):
+        """Test batch fetch returns sweets in requested order and lists unknown ids"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        first = create_sweet(name='First')
+        second = create_sweet(name='Second')
+        unknown = '00000000-0000-0000-0000-000000000000'
+        api_client.force_authenticate(user=user)
+        response = api_client.get(f'/api/sweets/batch/?ids={second.id},{unknown},{first.id}')
+        assert response.status_code == 200
+        assert [s['name'] for s in response.data['results']] == ['Second', 'First']
+        assert response.data['missing'] == [unknown]
+    
+    def test_batch_post_uses_single_query(self, api_client, create_user, create_sweet, django_assert_max_num_queries):
+        """Test batch fetch via POST issues one query for all sweets"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        sweets = [create_sweet(name=f'Sweet {i}') for i in range(5)]
+        api_client.force_authenticate(user=user)
+        with django_assert_max_num_queries(1):
+            response = api_client.post(
+                '/api/sweets/batch/',
+                {'ids': [str(s.id) for s in sweets]},
+                format='json'
+            )
+        assert response.status_code == 200
+        assert len(response.data['results']) == 5
+    
+    def test_batch_post_accepts_repeated_form_ids(self, api_client, create_user, create_sweet):
+        """Test a form-encoded POST may repeat the ids field"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        first = create_sweet(name='First')
+        second = create_sweet(name='Second')
+        api_client.force_authenticate(user=user)
+        response = api_client.post('/api/sweets/batch/', {'ids': [str(first.id), str(second.id)]})
+        assert response.status_code == 200
+        assert [s['name'] for s in response.data['results']] == ['First', 'Second']
+    
+    def test_batch_post_rejects_non_object_body(self, api_client, create_user):
+        """Test a JSON array body is a client error, not a server error"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        api_client.force_authenticate(user=user)
+        response = api_client.post('/api/sweets/batch/', ['00000000-0000-0000-0000-000000000000'], format='json')
+        assert response.status_code == 400
+    
+    def test_batch_rejects_invalid_and_oversized_requests(self, api_client, create_user, settings):
+        """Test batch fetch validates ids and the maximum batch size"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        api_client.force_authenticate(user=user)
+        response = api_client.get('/api/sweets/batch/?ids=not-a-uuid')
+        assert response.status_code == 400
+        
+        settings.SWEETS_BATCH_MAX_SIZE = 2
+        ids = ','.join(f'00000000-0000-0000-0000-00000000000{i}' for i in range(3))
+        response = api_client.get(f'/api/sweets/batch/?ids={ids}')
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestSweetChangesView:
+    
+    def test_changes_without_since_returns_full_catalog(self, api_client, create_user, create_sweet, settings):
+        """Test an initial sync returns every sweet and a watermark"""
+        settings.SWEETS_SYNC_SAFETY_LAG = 0
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        create_sweet(name='Chocolate Bar')
+        api_client.force_authenticate(user=user)
+        response = api_client.get('/api/sweets/changes/')
+        assert response.status_code == 200
+        assert len(response.data['changed']) == 1
+        assert response.data['deleted'] == []
+        assert response.data['watermark'] is not None
+    
+    def test_changes_since_watermark_returns_updates_and_tombstones(self, api_client, create_user, create_sweet, settings):
+        """Test an incremental sync only returns sweets changed or deleted after the watermark"""
+        settings.SWEETS_SYNC_SAFETY_LAG = 0
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        create_sweet(name='Unchanged')
+        purchased = create_sweet(name='Purchased')
+        deleted = create_sweet(name='Deleted')
+        api_client.force_authenticate(user=user)
+        watermark = api_client.get('/api/sweets/changes/').data['watermark']
+        
+        purchased.purchase(1)
+        deleted_id = str(deleted.id)
+        deleted.delete()
+        
+        response = api_client.get('/api/sweets/changes/', {'since': watermark})
+        assert response.status_code == 200
+        assert [s['name'] for s in response.data['changed']] == ['Purchased']
+        assert response.data['deleted'] == [deleted_id]
+        assert response.data['watermark'] > watermark
+        
+        response = api_client.get('/api/sweets/changes/', {'since': response.data['watermark']})
+        assert response.data['changed'] == []
+        assert response.data['deleted'] == []
+    
+    def test_changes_holds_back_recent_writes(self, api_client, create_user, create_sweet):
+        """Test writes inside the safety lag wait for a later sync"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        create_sweet(name='Just Added')
+        api_client.force_authenticate(user=user)
+        response = api_client.get('/api/sweets/changes/')
+        assert response.status_code == 200
+        assert response.data['changed'] == []
+        assert response.data['has_more'] is False
+    
+    def test_changes_pages_with_continuation_watermark(self, api_client, create_user, create_sweet, settings):
+        """Test a limited sync returns has_more and resumes from its watermark"""
+        settings.SWEETS_SYNC_SAFETY_LAG = 0
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        for name in ['First', 'Second', 'Third']:
+            create_sweet(name=name)
+        api_client.force_authenticate(user=user)
+        
+        response = api_client.get('/api/sweets/changes/', {'limit': 2})
+        assert response.status_code == 200
+        assert [s['name'] for s in response.data['changed']] == ['First', 'Second']
+        assert response.data['has_more'] is True
+        
+        response = api_client.get('/api/sweets/changes/', {'limit': 2, 'since': response.data['watermark']})
+        assert [s['name'] for s in response.data['changed']] == ['Third']
+        assert response.data['has_more'] is False
+    
+    def test_changes_rejects_invalid_since(self, api_client, create_user):
+        """Test an unparseable watermark is rejected"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        api_client.force_authenticate(user=user)
+        response = api_client.get('/api/sweets/changes/?since=yesterday')
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestSweetStreamView:
+    
+    def test_stream_unauthenticated(self):
+        """Test unauthenticated clients cannot open the stock stream"""
+        async def get():
+            return await AsyncClient().get('/api/sweets/stream/')
+        response = async_to_sync(get)()
+        assert response.status_code == 401
+    
+    def test_stream_closed_when_client_disconnects(self, create_user):
+        """Test a disconnected client's stream and subscription are released"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': '/api/sweets/stream/',
+            'root_path': '', 'query_string': b'', 'server': ('testserver', 80),
+            'headers': [(b'authorization', f'Bearer {AccessToken.for_user(user)}'.encode())],
+        }
+        sent = []
+        
+        async def scenario():
+            messages = asyncio.Queue()
+            await messages.put({'type': 'http.request', 'body': b'', 'more_body': False})
+            
+            async def send(message):
+                sent.append(message)
+                if message['type'] == 'http.response.body':
+                    await messages.put({'type': 'http.disconnect'})
+            
+            await asyncio.wait_for(application(scope, messages.get, send), timeout=5)
+        
+        async_to_sync(scenario)()
+        assert sent[0]['status'] == 200
+        assert broadcaster.subscriber_count == 0
+    
+    def test_stream_refused_under_wsgi(self, api_client, create_user):
+        """Test the stream is not served by a WSGI worker it would tie up"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        api_client.force_authenticate(user=user)
+        response = api_client.get('/api/sweets/stream/')
+        assert response.status_code == 501
+
+
+@pytest.mark.django_db
+class TestSweetSuggestView:
+    
+    def test_suggest_returns_id_and_name(self, api_client, create_user, create_sweet, django_capture_on_commit_callbacks):
+        """Test typeahead returns compact suggestions for new sweets"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        with django_capture_on_commit_callbacks(execute=True):
+            sweet = create_sweet(name='Peppermint Swirl')
+        api_client.force_authenticate(user=user)
+        response = api_client.get('/api/sweets/suggest/', {'q': 'pepp'})
+        assert response.status_code == 200
+        assert {'id': str(sweet.id), 'name': 'Peppermint Swirl'} in response.data
+
+
+@pytest.mark.django_db
+class TestSweetConcurrencyControl:
+    
+    def test_retrieve_and_update_return_version_etag(self, api_client, create_admin_user, create_sweet):
+        """Test the ETag tracks the sweet's version across updates"""
+        admin = create_admin_user(username='admin', email='admin@test.com', password='admin123')
+        sweet = create_sweet(name='Fudge')
+        api_client.force_authenticate(user=admin)
+        response = api_client.get(f'/api/sweets/{sweet.id}/')
+        assert response['ETag'] == '"1"'
+        
+        response = api_client.patch(f'/api/sweets/{sweet.id}/', {'price': '12.00'}, HTTP_IF_MATCH='"1"')
+        assert response.status_code == 200
+        assert response['ETag'] == '"2"'
+        assert response.data['version'] == 2
+    
+    def test_stale_if_match_returns_412(self, api_client, create_admin_user, create_sweet):
+        """Test an edit based on an old version is rejected"""
+        admin = create_admin_user(username='admin', email='admin@test.com', password='admin123')
+        sweet = create_sweet(name='Fudge', quantity=50)
+        api_client.force_authenticate(user=admin)
+        sweet.purchase(5)
+        
+        response = api_client.patch(f'/api/sweets/{sweet.id}/', {'quantity': 100}, HTTP_IF_MATCH='"1"')
+        assert response.status_code == 412
+        assert response['ETag'] == '"2"'
+        sweet.refresh_from_db()
+        assert sweet.quantity == 45
+    
+    def test_update_writes_only_changed_columns(self, api_client, create_admin_user, create_sweet):
+        """Test a full update does not overwrite a quantity it did not change"""
+        admin = create_admin_user(username='admin', email='admin@test.com', password='admin123')
+        sweet = create_sweet(name='Fudge', quantity=50)
+        api_client.force_authenticate(user=admin)
+        data = {'name': 'Vanilla Fudge', 'category': 'Test', 'price': '10.00', 'quantity': 50}
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.put(f'/api/sweets/{sweet.id}/', data)
+        assert response.status_code == 200
+        update_sql = next(q['sql'] for q in captured.captured_queries if q['sql'].startswith('UPDATE'))
+        assert '"name"' in update_sql
+        assert '"quantity"' not in update_sql
+        assert '"version" = ' in update_sql.split('WHERE')[1]
+
+
+@pytest.mark.django_db
+class TestCoalescingStatsView:
+    
+    def test_stats_as_admin(self, api_client, create_admin_user):
+        """Test admin can read request coalescing metrics"""
+        admin = create_admin_user(username='admin', email='admin@test.com', password='admin123')
+        api_client.force_authenticate(user=admin)
+        response = api_client.get('/api/sweets/coalescing-stats/')
+        assert response.status_code == 200
+        assert set(response.data) == {'leaders', 'collapsed', 'timeouts', 'in_flight'}
+    
+    def test_stats_as_regular_user(self, api_client, create_user):
+        """Test regular user cannot read request coalescing metrics"""
+        user = create_user(username='testuser', email='test@example.com', password='testpass123')
+        api_client.force_authenticate(user=user)
+        response = api_client.get('/api/sweets/coalescing-stats/')
+        assert response.status_code == 403
@@ -0,0 +1,141 @@
+# backend/sweets/tests/test_admin.py
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from sweets.models import Sweet
+from sweets.pagination import EstimatedCountPaginator
+
+User = get_user_model()
+
+CHANGELIST_URL = '/admin/sweets/sweet/'
+
+
+@pytest.fixture
+def admin_client(client, db):
+    superuser = User.objects.create_superuser(
+        username='superuser', email='superuser@example.com', password='superpass123'
+    )
+    client.force_login(superuser)
+    return client
+
+
+@pytest.mark.django_db
+class TestSweetAdmin:
+    
+    def test_changelist_sorts_and_filters_on_stock(self, admin_client, create_sweet):
+        """Test stock is a sortable column and an index-backed filter"""
+        create_sweet(name='Fudge', quantity=0)
+        create_sweet(name='Truffle', quantity=5)
+        
+        response = admin_client.get(CHANGELIST_URL, {'o': '5'})
+        assert response.status_code == 200
+        assert [s.name for s in response.context['cl'].result_list] == ['Fudge', 'Truffle']
+        
+        response = admin_client.get(CHANGELIST_URL, {'in_stock': 'yes'})
+        assert [s.name for s in response.context['cl'].result_list] == ['Truffle']
+    
+    def test_search_matches_name_and_category_prefixes(self, admin_client, create_sweet):
+        """Test admin search is a prefix match on name or category"""
+        create_sweet(name='Chocolate Bar', quantity=5, category='Bars')
+        create_sweet(name='Gummy Bears', quantity=5, category='Gummy')
+        create_sweet(name='Dark Truffle', quantity=5, category='Chocolate')
+        
+        response = admin_client.get(CHANGELIST_URL, {'q': 'choc'})
+        names = sorted(s.name for s in response.context['cl'].result_list)
+        assert names == ['Chocolate Bar', 'Dark Truffle']
+    
+    def test_search_ignores_case(self, admin_client, create_sweet):
+        """Test search matches prefixes whatever their case"""
+        create_sweet(name='Dark Truffle', quantity=5, category='Chocolate')
+        create_sweet(name='Gummy Bears', quantity=5, category='Gummy')
+        
+        for term in ['dark tr', 'DARK', 'Dark Truffle']:
+            response = admin_client.get(CHANGELIST_URL, {'q': term})
+            assert [s.name for s in response.context['cl'].result_list] == ['Dark Truffle']
+    
+    def test_bulk_restock_and_price_actions(self, admin_client, create_sweet):
+        """Test bulk actions update every selected sweet"""
+        first = create_sweet(name='Fudge', quantity=0)
+        second = create_sweet(name='Truffle', quantity=5)
+        selected = [str(first.pk), str(second.pk)]
+        
+        admin_client.post(CHANGELIST_URL, {
+            'action': 'restock_selected', '_selected_action': selected, 'amount': '10'
+        })
+        admin_client.post(CHANGELIST_URL, {
+            'action': 'set_price_selected', '_selected_action': selected, 'amount': '3.50'
+        })
+        
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.quantity, second.quantity) == (10, 15)
+        assert first.price == second.price == Decimal('3.50')
+    
+    def test_set_price_rejects_out_of_range_amounts(self, admin_client, create_sweet):
+        """Test prices the column cannot hold are refused rather than rounded or crashing"""
+        sweet = create_sweet(name='Fudge', quantity=5)
+        
+        for amount in ['3.999', '123456789012', '0']:
+            response = admin_client.post(CHANGELIST_URL, {
+                'action': 'set_price_selected', '_selected_action': [str(sweet.pk)], 'amount': amount
+            })
+            assert response.status_code == 302
+        
+        sweet.refresh_from_db()
+        assert sweet.price == Decimal('10.00')
+    
+    def test_bulk_restock_publishes_stock_events(self, admin_client, monkeypatch, django_capture_on_commit_callbacks, create_sweet):
+        """Test bulk actions push the new stock levels to stream subscribers"""
+        sweet = create_sweet(name='Fudge', quantity=0)
+        published = []
+        monkeypatch.setattr('sweets.admin.broadcaster.publish', published.append)
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.post(CHANGELIST_URL + '?in_stock=no', {
+                'action': 'restock_selected', '_selected_action': [str(sweet.pk)], 'amount': '10'
+            })
+        
+        assert published == [
+            {'id': str(sweet.pk), 'quantity': 10, 'is_in_stock': True, 'price': '10.00'}
+        ]
+    
+    def test_large_bulk_action_drops_subscribers(self, admin_client, monkeypatch, django_capture_on_commit_callbacks, create_sweet):
+        """Test an update larger than a subscriber's buffer asks clients to resync"""
+        selected = [str(create_sweet(name=name, quantity=0).pk) for name in ['Fudge', 'Truffle']]
+        published, dropped = [], []
+        monkeypatch.setattr('sweets.admin.broadcaster.max_pending', 1)
+        monkeypatch.setattr('sweets.admin.broadcaster.publish', published.append)
+        monkeypatch.setattr('sweets.admin.broadcaster.drop_all', lambda: dropped.append(True))
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.post(CHANGELIST_URL, {
+                'action': 'restock_selected', '_selected_action': selected, 'amount': '10'
+            })
+        
+        assert published == []
+        assert dropped == [True]
+        assert Sweet.objects.filter(quantity=10).count() == 2
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+    
+    def test_large_unfiltered_queryset_uses_estimate(self, django_assert_num_queries, create_sweet):
+        """Test unfiltered querysets are counted from table statistics"""
+        for index in range(3):
+            create_sweet(name=f'Sweet {index}', quantity=1)
+        paginator = EstimatedCountPaginator(Sweet.objects.all(), 20)
+        paginator.estimate_threshold = 1
+        
+        with django_assert_num_queries(1) as captured:
+            assert paginator.count == 3
+        assert 'COUNT' not in captured.captured_queries[0]['sql']
+    
+    def test_filtered_queryset_is_counted_exactly(self, create_sweet):
+        """Test filtered querysets still get an exact count"""
+        create_sweet(name='Fudge', quantity=0)
+        create_sweet(name='Truffle', quantity=5)
+        paginator = EstimatedCountPaginator(Sweet.objects.filter(quantity__gt=0), 20)
+        paginator.estimate_threshold = 1
+        
+        assert paginator.count == 1
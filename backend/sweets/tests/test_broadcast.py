@@ -0,0 +1,96 @@
+# backend/sweets/tests/test_broadcast.py
+import asyncio
+import pytest
+from decimal import Decimal
+from sweets.broadcast import StockBroadcaster, broadcaster
+from sweets.models import Sweet
+
+
+def make_event(sweet_id, quantity):
+    return {'id': sweet_id, 'quantity': quantity, 'is_in_stock': quantity > 0, 'price': '1.00'}
+
+
+class TestStockBroadcaster:
+    
+    def test_publish_fans_out_to_every_subscriber(self):
+        """Test each subscriber receives published events"""
+        async def scenario():
+            hub = StockBroadcaster()
+            first, second = hub.subscribe(), hub.subscribe()
+            hub.publish(make_event('a', 5))
+            return await first.get(timeout=1), await second.get(timeout=1)
+        
+        first_events, second_events = asyncio.run(scenario())
+        assert first_events == second_events == [make_event('a', 5)]
+    
+    def test_rapid_updates_to_same_sweet_are_coalesced(self):
+        """Test only the latest state of a sweet is delivered"""
+        async def scenario():
+            hub = StockBroadcaster()
+            subscription = hub.subscribe()
+            hub.publish(make_event('a', 5))
+            hub.publish(make_event('b', 2))
+            hub.publish(make_event('a', 3))
+            return await subscription.get(timeout=1)
+        
+        assert asyncio.run(scenario()) == [make_event('a', 3), make_event('b', 2)]
+    
+    def test_slow_consumer_is_dropped(self):
+        """Test a subscriber that falls too far behind is removed"""
+        async def scenario():
+            hub = StockBroadcaster(max_pending=2)
+            subscription = hub.subscribe()
+            for sweet_id in 'abc':
+                hub.publish(make_event(sweet_id, 1))
+            return subscription, hub
+        
+        subscription, hub = asyncio.run(scenario())
+        assert subscription.dropped
+        assert hub.subscriber_count == 0
+    
+    def test_drop_all_wakes_and_removes_subscribers(self):
+        """Test dropping every subscriber wakes waiting clients so they resync"""
+        async def scenario():
+            hub = StockBroadcaster()
+            subscription = hub.subscribe()
+            hub.publish(make_event('a', 5))
+            hub.drop_all()
+            return await subscription.get(timeout=1), subscription, hub
+        
+        events, subscription, hub = asyncio.run(scenario())
+        assert events == []
+        assert subscription.dropped
+        assert hub.subscriber_count == 0
+
+
+@pytest.mark.django_db
+class TestStockSignals:
+    
+    def test_save_and_delete_publish_after_commit(self, django_capture_on_commit_callbacks):
+        """Test purchases and deletions are broadcast once committed"""
+        async def subscribe():
+            return broadcaster.subscribe()
+        
+        async def drain(subscription):
+            return await subscription.get(timeout=0)
+        
+        loop = asyncio.new_event_loop()
+        try:
+            subscription = loop.run_until_complete(subscribe())
+            with django_capture_on_commit_callbacks(execute=True):
+                sweet = Sweet.objects.create(
+                    name='Toffee', category='Chewy', price=Decimal('2.00'), quantity=3
+                )
+                sweet.purchase(3)
+            events = loop.run_until_complete(drain(subscription))
+            assert events == [
+                {'id': str(sweet.id), 'quantity': 0, 'is_in_stock': False, 'price': '2.00'}
+            ]
+            
+            with django_capture_on_commit_callbacks(execute=True):
+                sweet.delete()
+            events = loop.run_until_complete(drain(subscription))
+            assert events[0]['deleted'] is True
+        finally:
+            broadcaster.unsubscribe(subscription)
+            loop.close()
@@ -0,0 +1,110 @@
+# backend/sweets/tests/test_coalesce.py
+import threading
+import time
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from sweets.coalesce import SingleFlight, single_flight
+from sweets.models import Sweet
+from sweets.views import SweetViewSet
+
+User = get_user_model()
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+    
+    def worker(index):
+        results[index] = target()
+    
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight:
+    
+    def test_concurrent_calls_share_one_computation(self):
+        """Test only the leader computes while others wait for its result"""
+        flight = SingleFlight()
+        computed = []
+        
+        def compute():
+            computed.append(1)
+            time.sleep(0.2)
+            return 'result'
+        
+        results = run_concurrently(5, lambda: flight.do('key', compute, timeout=5))
+        
+        assert len(computed) == 1
+        assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+        assert all(value == 'result' for value, _ in results)
+        assert flight.stats() == {'leaders': 1, 'collapsed': 4, 'timeouts': 0, 'in_flight': 0}
+    
+    def test_waiter_computes_itself_after_timeout(self):
+        """Test a waiter stops waiting for a slow leader after the timeout"""
+        flight = SingleFlight()
+        release = threading.Event()
+        leader = threading.Thread(target=flight.do, args=('key', release.wait))
+        leader.start()
+        time.sleep(0.05)
+        
+        assert flight.do('key', lambda: 'own', timeout=0.05) == ('own', False)
+        release.set()
+        leader.join()
+        assert flight.stats()['timeouts'] == 1
+    
+    def test_leader_failure_is_not_shared(self):
+        """Test waiters recompute when the leader raised"""
+        flight = SingleFlight()
+        started = threading.Event()
+        
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError('boom')
+        
+        def lead():
+            with pytest.raises(RuntimeError):
+                flight.do('key', failing)
+        
+        leader = threading.Thread(target=lead)
+        leader.start()
+        started.wait()
+        assert flight.do('key', lambda: 'own', timeout=5) == ('own', False)
+        leader.join()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCoalescedViews:
+    
+    def test_identical_concurrent_searches_are_collapsed(self, monkeypatch):
+        """Test concurrent identical searches run the query once and share bytes"""
+        Sweet.objects.create(name='Truffle', category='Chocolate', price=Decimal('2.00'), quantity=3)
+        user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        original = SweetViewSet.get_serializer
+        calls = []
+        
+        def slow_get_serializer(self, *args, **kwargs):
+            calls.append(1)
+            time.sleep(0.3)
+            return original(self, *args, **kwargs)
+        
+        monkeypatch.setattr(SweetViewSet, 'get_serializer', slow_get_serializer)
+        collapsed_before = single_flight.stats()['collapsed']
+        
+        def search():
+            client = APIClient()
+            client.force_authenticate(user=user)
+            return client.get('/api/sweets/search/', {'category': 'Chocolate'})
+        
+        responses = run_concurrently(3, search)
+        
+        assert len(calls) == 1
+        assert len({response.content for response in responses}) == 1
+        assert sum(response.has_header('X-Coalesced') for response in responses) == 2
+        assert single_flight.stats()['collapsed'] - collapsed_before == 2
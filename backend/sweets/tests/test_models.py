@@ -1,4 +1,5 @@
 # backend/sweets/tests/test_models.py
+import uuid
 import pytest
 from django.contrib.auth import get_user_model
 from decimal import Decimal
@@ -93,6 +94,19 @@ class TestSweetModel:
         with pytest.raises(ValueError, match="Insufficient stock"):
             sweet.purchase(5)
     
+    def test_purchase_of_concurrently_deleted_sweet_raises_value_error(self):
+        """Test a sweet deleted before the purchase lands is reported, not a crash"""
+        sweet = Sweet.objects.create(
+            name="Vanishing Mint",
+            category="Mints",
+            price=Decimal("1.00"),
+            quantity=2
+        )
+        Sweet.objects.filter(pk=sweet.pk).delete()
+        
+        with pytest.raises(ValueError, match="no longer available"):
+            sweet.purchase(1)
+    
     def test_restock_increases_quantity(self):
         """Test restocking increases quantity"""
         sweet = Sweet.objects.create(
@@ -117,4 +131,65 @@ class TestSweetModel:
         )
         
         with pytest.raises(ValueError, match="Restock amount must be positive"):
-            sweet.restock(-5)
\ No newline at end of file
+            sweet.restock(-5)
+    
+    def test_new_sweets_get_time_ordered_ids(self):
+        """Test new sweets get version 7 UUIDs that sort by creation order"""
+        sweets = [
+            Sweet.objects.create(
+                name=f"Sweet {index}",
+                category="Test",
+                price=Decimal("1.00"),
+                quantity=1
+            )
+            for index in range(5)
+        ]
+        
+        assert all(sweet.id.version == 7 for sweet in sweets)
+        assert [sweet.id for sweet in sweets] == sorted(sweet.id for sweet in sweets)
+    
+    def test_existing_uuid4_ids_still_work(self):
+        """Test sweets created with random uuid4 ids can still be fetched"""
+        legacy_id = uuid.uuid4()
+        Sweet.objects.create(
+            id=legacy_id,
+            name="Legacy",
+            category="Test",
+            price=Decimal("1.00"),
+            quantity=1
+        )
+        
+        assert Sweet.objects.get(id=legacy_id).name == "Legacy"
+    
+    def test_writes_increment_version(self):
+        """Test every write to a sweet bumps its version"""
+        sweet = Sweet.objects.create(
+            name="Nougat",
+            category="Chewy",
+            price=Decimal("2.00"),
+            quantity=10
+        )
+        assert sweet.version == 1
+        
+        sweet.purchase(2)
+        sweet.restock(5)
+        sweet.name = "Almond Nougat"
+        sweet.save()
+        
+        sweet.refresh_from_db()
+        assert sweet.version == 4
+        assert sweet.quantity == 13
+    
+    def test_purchase_is_atomic_against_stale_instances(self):
+        """Test purchases on an out-of-date copy cannot oversell"""
+        sweet = Sweet.objects.create(
+            name="Brittle",
+            category="Hard Candy",
+            price=Decimal("2.00"),
+            quantity=3
+        )
+        stale_copy = Sweet.objects.get(id=sweet.id)
+        sweet.purchase(2)
+        
+        with pytest.raises(ValueError, match="Only 1 available"):
+            stale_copy.purchase(2)
@@ -0,0 +1,52 @@
+# backend/sweets/tests/test_query_plans.py
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from sweets.models import Sweet
+
+User = get_user_model()
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='query plans are checked on SQLite'
+)
+
+
+def search_plan(params):
+    """Run a search request and return the query plan of its sweets query"""
+    user = User.objects.create_user(username='planner', email='planner@example.com', password='testpass123')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get('/api/sweets/search/', params)
+    assert response.status_code == 200
+    
+    sql = next(q['sql'] for q in captured.captured_queries if 'sweets_sweet' in q['sql'])
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+
+@pytest.mark.django_db
+class TestSearchQueryPlans:
+    
+    def test_in_stock_category_sorted_by_price_uses_partial_index(self):
+        """Test the storefront query is answered from the partial index"""
+        Sweet.objects.create(name='Truffle', category='Chocolate', price=Decimal('2.00'), quantity=3)
+        
+        plan = search_plan({
+            'in_stock': 'true', 'category_exact': 'Chocolate', 'ordering': 'price'
+        })
+        assert 'sweet_in_stock_cat_price_idx' in plan
+        assert 'TEMP B-TREE' not in plan
+    
+    def test_price_bounds_use_partial_index(self):
+        """Test price bounds become a range scan on the partial index"""
+        plan = search_plan({
+            'in_stock': 'true', 'category_exact': 'Chocolate',
+            'min_price': '1.00', 'max_price': '5.00', 'ordering': '-price'
+        })
+        assert 'sweet_in_stock_cat_price_idx' in plan
+        assert 'price>' in plan and 'price<' in plan
@@ -0,0 +1,118 @@
+# backend/sweets/tests/test_snapshot.py
+import json
+import uuid
+import pytest
+from django.db.models import F
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from sweets.models import Sweet
+from sweets.serializers import SweetSerializer
+from sweets.snapshot import (
+    CatalogSnapshot, SnapshotFile, build_snapshot, catalog_version, fcntl, refresh_snapshot
+)
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestSnapshotFile:
+    
+    def test_pages_and_records_match_serializer(self, tmp_path, create_sweet):
+        """Test snapshot slices hold the same JSON the serializer produces"""
+        sweets = [create_sweet(name=f'Sweet {index}') for index in range(5)]
+        path = tmp_path / 'catalog.snapshot'
+        
+        assert build_snapshot(path) == 5
+        snapshot = SnapshotFile(path)
+        
+        listed = json.loads(b'[' + bytes(snapshot.page(0, 3)) + b']')
+        assert listed == json.loads(json.dumps(SweetSerializer(Sweet.objects.all()[:3], many=True).data))
+        assert json.loads(bytes(snapshot.page(4, 100)))['name'] == 'Sweet 0'
+        assert json.loads(bytes(snapshot.record(sweets[2].id)))['name'] == 'Sweet 2'
+        assert snapshot.record(uuid.uuid4()) is None
+    
+    def test_rebuilt_when_catalog_changes(self, tmp_path, django_capture_on_commit_callbacks, create_sweet):
+        """Test a stale snapshot is rebuilt in the background and remapped"""
+        create_sweet(name='Fudge')
+        catalog = CatalogSnapshot(str(tmp_path / 'catalog.snapshot'), check_interval=0)
+        
+        def get():
+            with django_capture_on_commit_callbacks(execute=True):
+                catalog.get()
+            return catalog.get()
+        
+        assert get().count == 1
+        
+        create_sweet(name='Truffle')
+        assert get().count == 2
+        
+        Sweet.objects.filter(name='Fudge').delete()
+        assert get().count == 1
+    
+    def test_late_commit_changes_catalog_version(self, create_sweet):
+        """Test a write stamped before the newest one still makes the snapshot stale"""
+        older = create_sweet(name='Fudge')
+        create_sweet(name='Truffle')
+        version = catalog_version()
+        
+        Sweet.objects.filter(id=older.id).update(quantity=0, version=F('version') + 1)
+        assert catalog_version() != version
+    
+    def test_stale_snapshot_served_while_rebuild_is_queued(self, tmp_path, settings, create_sweet):
+        """Test a request never builds; it keeps the current mapping and queues a rebuild"""
+        settings.TASKS_ALWAYS_SYNC = False
+        path = str(tmp_path / 'catalog.snapshot')
+        create_sweet(name='Fudge')
+        catalog = CatalogSnapshot(path, check_interval=0)
+        assert catalog.get() is None
+        
+        refresh_snapshot(path)
+        create_sweet(name='Truffle')
+        assert catalog.get().count == 1
+        
+        refresh_snapshot(path)
+        assert catalog.get().count == 2
+    
+    @pytest.mark.skipif(fcntl is None, reason='builds are only coordinated where flock exists')
+    def test_refresh_skipped_while_another_process_builds(self, tmp_path, create_sweet):
+        """Test only the holder of the lock file builds, and a current file is left alone"""
+        path = str(tmp_path / 'catalog.snapshot')
+        create_sweet(name='Fudge')
+        
+        with open(path + '.lock', 'a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            assert refresh_snapshot(path) is None
+        
+        assert refresh_snapshot(path) == 1
+        assert refresh_snapshot(path) is None
+
+
+@pytest.mark.django_db
+class TestSnapshotViews:
+    
+    def test_list_and_retrieve_served_from_snapshot(self, tmp_path, settings, create_sweet):
+        """Test list pagination and retrieve read from the snapshot"""
+        settings.SWEETS_SNAPSHOT_PATH = str(tmp_path / 'catalog.snapshot')
+        settings.SWEETS_SNAPSHOT_CHECK_INTERVAL = 0
+        sweets = [create_sweet(name=f'Sweet {index}') for index in range(25)]
+        refresh_snapshot(settings.SWEETS_SNAPSHOT_PATH)
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123'
+        ))
+        
+        first = client.get('/api/sweets/').json()
+        assert first['count'] == 25
+        assert len(first['results']) == 20
+        assert first['previous'] is None
+        assert first['next'].endswith('?page=2')
+        
+        second = client.get(first['next']).json()
+        assert [s['name'] for s in second['results']] == [f'Sweet {index}' for index in range(4, -1, -1)]
+        assert second['next'] is None
+        assert client.get('/api/sweets/?page=3').status_code == 404
+        
+        response = client.get(f'/api/sweets/{sweets[0].id}/')
+        assert response.status_code == 200
+        assert response.json()['name'] == 'Sweet 0'
+        assert response['ETag'] == '"1"'
@@ -0,0 +1,94 @@
+# backend/sweets/tests/test_suggest.py
+import time
+import pytest
+from datetime import timedelta
+from sweets.models import Sweet
+from sweets.suggest import PrefixIndex
+
+
+@pytest.mark.django_db
+class TestPrefixIndex:
+    
+    def test_matches_name_word_and_category_prefixes(self, create_sweet):
+        """Test sweets are found by name, a later word of the name or category"""
+        truffle = create_sweet(name='Dark Truffle', category='Chocolate')
+        create_sweet(name='Gummy Bears', category='Gummy')
+        index = PrefixIndex()
+        
+        assert index.suggest('dar') == [{'id': str(truffle.id), 'name': 'Dark Truffle'}]
+        assert index.suggest('TRUF') == [{'id': str(truffle.id), 'name': 'Dark Truffle'}]
+        assert [s['name'] for s in index.suggest('choc')] == ['Dark Truffle']
+        assert index.suggest('') == []
+    
+    def test_limit_and_lookup_without_queries(self, django_assert_num_queries, create_sweet):
+        """Test at most limit results are returned straight from memory"""
+        for index in range(5):
+            create_sweet(name=f'Caramel {index}')
+        prefix_index = PrefixIndex(refresh_interval=60)
+        prefix_index.suggest('warm-up')
+        
+        with django_assert_num_queries(0):
+            assert len(prefix_index.suggest('cara', limit=3)) == 3
+    
+    def test_incremental_update_and_remove(self, create_sweet):
+        """Test updates and removals apply to a built index"""
+        sweet = create_sweet(name='Toffee')
+        index = PrefixIndex(refresh_interval=60)
+        index.suggest('warm-up')
+        
+        index.update(sweet.id, 'Butter Toffee', sweet.category)
+        assert [s['name'] for s in index.suggest('butter')] == ['Butter Toffee']
+        index.remove(sweet.id)
+        assert index.suggest('butter') == []
+    
+    def test_refresh_picks_up_other_processes_writes(self, create_sweet):
+        """Test changes made elsewhere are applied after the refresh interval"""
+        index = PrefixIndex(refresh_interval=0)
+        index.suggest('warm-up')
+        time.sleep(0.001)
+        gone = create_sweet(name='Liquorice')
+        assert [s['name'] for s in index.suggest('liq')] == ['Liquorice']
+        
+        Sweet.objects.filter(id=gone.id).delete()
+        assert index.suggest('liq') == []
+    
+    def test_refresh_picks_up_late_commits(self, create_sweet):
+        """Test a write stamped before the watermark but committed after it is still indexed"""
+        create_sweet(name='Fudge')
+        index = PrefixIndex(refresh_interval=0)
+        index.suggest('warm-up')
+        late = create_sweet(name='Liquorice')
+        Sweet.objects.filter(id=late.id).update(updated_at=index._watermark - timedelta(seconds=1))
+        
+        assert [s['name'] for s in index.suggest('liq')] == ['Liquorice']
+    
+    def test_falls_back_to_database_when_over_capacity(self, create_sweet):
+        """Test an index past its size cap answers from the database"""
+        create_sweet(name='Marshmallow')
+        create_sweet(name='Marzipan')
+        create_sweet(name='Fudge', category='Marbled')
+        index = PrefixIndex(max_entries=2)
+        
+        assert [s['name'] for s in index.suggest('MAR')] == ['Marshmallow', 'Marzipan', 'Fudge']
+        assert [s['name'] for s in index.suggest('mar', limit=2)] == ['Marshmallow', 'Marzipan']
+        assert index.complete is False
+
+
+@pytest.mark.django_db
+class TestSuggestSignals:
+    
+    def test_stock_changes_do_not_touch_the_index(self, monkeypatch, django_capture_on_commit_callbacks, create_sweet):
+        """Test purchases and restocks skip reindexing; renames still reindex"""
+        sweet = create_sweet(name='Toffee')
+        updates = []
+        monkeypatch.setattr('sweets.signals.suggest_index.update', lambda *args: updates.append(args))
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            sweet.purchase(1)
+            sweet.restock(1)
+        assert updates == []
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            sweet.name = 'Butter Toffee'
+            sweet.save(update_fields=['name'])
+        assert updates == [(sweet.id, 'Butter Toffee', 'Test')]
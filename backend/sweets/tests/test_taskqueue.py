@@ -0,0 +1,103 @@
+# backend/sweets/tests/test_taskqueue.py
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from sweets.models import QueuedTask
+from sweets.taskqueue import TaskPool, process_durable_tasks, task
+
+calls = []
+
+
+@task(retries=2, backoff=0.1)
+def record(value):
+    calls.append(value)
+
+
+@task(retries=1, backoff=0.1, durable=True)
+def record_durable(value):
+    calls.append(value)
+
+
+@task(retries=1, backoff=60, durable=True)
+def always_fails():
+    raise RuntimeError('boom')
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+class TestTask:
+    
+    def test_retries_with_exponential_backoff(self):
+        """Test a failing task is retried with doubling delays"""
+        attempts = []
+        
+        @task(retries=3, backoff=0.5)
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RuntimeError('try again')
+            return 'done'
+        
+        sleeps = []
+        assert flaky.run_with_retries((), {}, sleep=sleeps.append) == 'done'
+        assert sleeps == [0.5, 1.0]
+    
+    def test_gives_up_after_last_retry(self):
+        """Test the last error is raised once retries are exhausted"""
+        @task(retries=1)
+        def broken():
+            raise RuntimeError('boom')
+        
+        with pytest.raises(RuntimeError):
+            broken.run_with_retries((), {}, sleep=lambda seconds: None)
+
+
+@pytest.mark.django_db
+class TestTaskDelivery:
+    
+    def test_delay_runs_after_commit_in_sync_mode(self, django_capture_on_commit_callbacks):
+        """Test tasks wait for the transaction to commit"""
+        with django_capture_on_commit_callbacks(execute=True):
+            record.delay('after-commit')
+            assert calls == []
+        assert calls == ['after-commit']
+    
+    def test_thread_pool_runs_and_drains(self, settings):
+        """Test queued tasks are run by worker threads and drained on shutdown"""
+        settings.TASKS_ALWAYS_SYNC = False
+        pool = TaskPool(workers=2, max_queue=2)
+        for value in range(10):
+            pool.submit(record, (value,))
+        pool.shutdown()
+        
+        assert sorted(calls) == list(range(10))
+    
+    def test_durable_task_is_stored_and_consumed(self, settings):
+        """Test durable tasks are written to the queue table and run by the worker"""
+        settings.TASKS_ALWAYS_SYNC = False
+        record_durable.delay('stored')
+        assert QueuedTask.objects.count() == 1
+        
+        assert process_durable_tasks() == 1
+        assert calls == ['stored']
+        assert QueuedTask.objects.count() == 0
+    
+    def test_failed_durable_task_is_retried_then_marked_failed(self, settings):
+        """Test durable failures back off and end up failed after max attempts"""
+        settings.TASKS_ALWAYS_SYNC = False
+        always_fails.delay()
+        
+        process_durable_tasks()
+        queued = QueuedTask.objects.get()
+        assert queued.status == QueuedTask.PENDING
+        assert queued.run_after > timezone.now() + timedelta(seconds=30)
+        assert process_durable_tasks() == 0
+        
+        QueuedTask.objects.update(run_after=timezone.now())
+        process_durable_tasks()
+        queued.refresh_from_db()
+        assert queued.status == QueuedTask.FAILED
+        assert 'boom' in queued.last_error
@@ -1,11 +1,12 @@
 # backend/sweets/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import SweetViewSet
+from .views import SweetViewSet, stock_stream
 
 router = DefaultRouter()
 router.register(r'sweets', SweetViewSet, basename='sweet')
 
 urlpatterns = [
+    path('sweets/stream/', stock_stream, name='sweet-stream'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
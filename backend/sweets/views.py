@@ -1,12 +1,77 @@
 # backend/sweets/views.py
+import json
+import math
+import uuid
+from collections.abc import Mapping
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, status
+from rest_framework.exceptions import AuthenticationFailed, NotFound
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.fields import DateTimeField
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.db.models import Q
-from .models import Sweet
-from .serializers import SweetSerializer, PurchaseSerializer, RestockSerializer
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Sweet, DeletedSweet
+from .serializers import (
+    SweetSerializer, PurchaseSerializer, RestockSerializer, SweetBatchSerializer
+)
 from .permissions import IsAdminOrReadOnly, IsAdmin
+from .broadcast import broadcaster
+from .suggest import suggest_index
+from .snapshot import get_catalog_snapshot
+from .tasks import notify_low_stock
+from .coalesce import coalesce, single_flight
+
+SEARCH_ORDERINGS = ('price', '-price', 'name', '-created_at')
+
+
+def parse_price(value):
+    """
+    Parse a price query param as a Decimal.
+    
+    Returns:
+        Decimal or None: None if the value is not a finite number
+    """
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        return None
+    return price if price.is_finite() else None
+
+
+def sweet_etag(sweet):
+    """ETag for a sweet's current version"""
+    return f'"{sweet.version}"'
+
+
+def parse_if_match(header):
+    """
+    Versions accepted by an If-Match header.
+    
+    Returns:
+        set or None: None for "*" (any version); unparseable tags are ignored
+    """
+    versions = set()
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return None
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag.isdigit():
+            versions.add(int(tag))
+    return versions
+
 
 class SweetViewSet(viewsets.ModelViewSet):
     """
@@ -24,18 +89,137 @@ class SweetViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated(), IsAdmin()]
         return super().get_permissions()
     
+    @coalesce
+    def list(self, request, *args, **kwargs):
+        """
+        List sweets, served from the shared catalog snapshot when enabled
+        """
+        snapshot = get_catalog_snapshot()
+        if snapshot is None:
+            return super().list(request, *args, **kwargs)
+        
+        page_size = self.paginator.get_page_size(request)
+        page_count = max(1, math.ceil(snapshot.count / page_size))
+        try:
+            page = int(request.query_params.get(self.paginator.page_query_param, 1))
+        except ValueError:
+            raise NotFound('Invalid page.')
+        if not 1 <= page <= page_count:
+            raise NotFound('Invalid page.')
+        
+        url = request.build_absolute_uri()
+        page_param = self.paginator.page_query_param
+        next_url = replace_query_param(url, page_param, page + 1) if page < page_count else None
+        if page == 1:
+            previous_url = None
+        elif page == 2:
+            previous_url = remove_query_param(url, page_param)
+        else:
+            previous_url = replace_query_param(url, page_param, page - 1)
+        
+        start = (page - 1) * page_size
+        body = b''.join([
+            b'{"count":%d,"next":%s,"previous":%s,"results":[' % (
+                snapshot.count,
+                json.dumps(next_url).encode(),
+                json.dumps(previous_url).encode()
+            ),
+            snapshot.page(start, start + page_size),
+            b']}'
+        ])
+        return HttpResponse(body, content_type='application/json')
+    
+    @coalesce
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve a sweet, served from the shared catalog snapshot when enabled
+        The ETag comes from the version in the record, so from the snapshot
+        it can lag the database until the next rebuild; an update sent with
+        a lagging If-Match gets 412 and the client refetches.
+        """
+        snapshot = get_catalog_snapshot()
+        if snapshot is not None:
+            try:
+                record = snapshot.record(uuid.UUID(str(kwargs.get('pk'))))
+            except ValueError:
+                record = None
+            if record is not None:
+                response = HttpResponse(record, content_type='application/json')
+                response['ETag'] = f'"{json.loads(bytes(record))["version"]}"'
+                return response
+        instance = self.get_object()
+        response = Response(self.get_serializer(instance).data)
+        response['ETag'] = sweet_etag(instance)
+        return response
+    
+    def update(self, request, *args, **kwargs):
+        """
+        Update a sweet with optimistic concurrency control
+        Only changed columns are written, in a single UPDATE conditional on
+        the version the client saw: the If-Match header if sent, otherwise
+        the version loaded by this request. A mismatch returns 412.
+        """
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()
+        
+        if_match = request.headers.get('If-Match')
+        if if_match is not None:
+            accepted = parse_if_match(if_match)
+            if accepted is not None and instance.version not in accepted:
+                return self._precondition_failed(instance)
+        expected_version = instance.version
+        
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        changed = {
+            field: value
+            for field, value in serializer.validated_data.items()
+            if getattr(instance, field) != value
+        }
+        
+        if changed and not instance.apply_update({'version': expected_version}, **changed):
+            instance.refresh_from_db()
+            return self._precondition_failed(instance)
+        
+        response = Response(self.get_serializer(instance).data)
+        response['ETag'] = sweet_etag(instance)
+        return response
+    
+    def _precondition_failed(self, instance):
+        response = Response(
+            {'error': 'Sweet was modified by another request. Fetch it again and retry.'},
+            status=status.HTTP_412_PRECONDITION_FAILED
+        )
+        response['ETag'] = sweet_etag(instance)
+        return response
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsAdmin], url_path='coalescing-stats')
+    def coalescing_stats(self, request):
+        """
+        Request coalescing metrics (Admin only)
+        """
+        return Response(single_flight.stats())
+    
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    @coalesce
     def search(self, request):
         """
-        Search for sweets by name, category, or price range
-        Query params: name, category, min_price, max_price
+        Search for sweets by name, category, price range or stock
+        Query params: name, category, category_exact, min_price, max_price,
+        in_stock (true/false), ordering (price, -price, name, -created_at)
+        
+        in_stock=true with category_exact and price ordering/bounds is served
+        by the partial (category, price) WHERE quantity > 0 index.
         """
         queryset = self.get_queryset()
         
         name = request.query_params.get('name', None)
         category = request.query_params.get('category', None)
+        category_exact = request.query_params.get('category_exact', None)
         min_price = request.query_params.get('min_price', None)
         max_price = request.query_params.get('max_price', None)
+        in_stock = request.query_params.get('in_stock', None)
+        ordering = request.query_params.get('ordering', None)
         
         if name:
             queryset = queryset.filter(name__icontains=name)
@@ -43,27 +227,173 @@ class SweetViewSet(viewsets.ModelViewSet):
         if category:
             queryset = queryset.filter(category__icontains=category)
         
+        if category_exact:
+            queryset = queryset.filter(category=category_exact)
+        
         if min_price:
-            try:
-                queryset = queryset.filter(price__gte=float(min_price))
-            except ValueError:
+            price = parse_price(min_price)
+            if price is None:
                 return Response(
                     {'error': 'Invalid min_price value'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            queryset = queryset.filter(price__gte=price)
         
         if max_price:
-            try:
-                queryset = queryset.filter(price__lte=float(max_price))
-            except ValueError:
+            price = parse_price(max_price)
+            if price is None:
                 return Response(
                     {'error': 'Invalid max_price value'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            queryset = queryset.filter(price__lte=price)
+        
+        if in_stock:
+            if in_stock.lower() in ('true', '1'):
+                queryset = queryset.filter(quantity__gt=0)
+            elif in_stock.lower() in ('false', '0'):
+                queryset = queryset.filter(quantity=0)
+            else:
+                return Response(
+                    {'error': 'Invalid in_stock value'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        if ordering:
+            if ordering not in SEARCH_ORDERINGS:
+                return Response(
+                    {'error': f'Invalid ordering value. Choose from: {", ".join(SEARCH_ORDERINGS)}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            queryset = queryset.order_by(ordering)
         
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    @coalesce
+    def suggest(self, request):
+        """
+        Typeahead suggestions from the in-process prefix index
+        Query params: q, limit (default and cap set by SWEETS_SUGGEST_LIMIT)
+        """
+        max_limit = getattr(settings, 'SWEETS_SUGGEST_LIMIT', 10)
+        try:
+            limit = int(request.query_params.get('limit', max_limit))
+        except ValueError:
+            return Response(
+                {'error': 'Invalid limit value'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(1, min(limit, max_limit))
+        
+        query = request.query_params.get('q', '')
+        return Response(suggest_index.suggest(query, limit))
+    
+    @action(detail=False, methods=['get', 'post'], permission_classes=[IsAuthenticated])
+    @coalesce
+    def batch(self, request):
+        """
+        Fetch several sweets by id with a single query
+        GET query param: ids (comma separated); POST body: {"ids": [...]}
+        Results keep the order the ids were requested in
+        """
+        if request.method == 'GET':
+            raw_ids = request.query_params.get('ids', '')
+            ids = [value.strip() for value in raw_ids.split(',') if value.strip()]
+            serializer = SweetBatchSerializer(data={'ids': ids})
+        elif isinstance(request.data, Mapping):
+            # Passing the body through lets a form QueryDict supply repeated ids
+            serializer = SweetBatchSerializer(data=request.data)
+        else:
+            return Response(
+                {'error': 'Request body must be an object with an "ids" list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        requested_ids = serializer.validated_data['ids']
+        sweets_by_id = {
+            sweet.id: sweet
+            for sweet in self.get_queryset().filter(id__in=requested_ids)
+        }
+        found = [sweets_by_id[sweet_id] for sweet_id in requested_ids if sweet_id in sweets_by_id]
+        missing = [str(sweet_id) for sweet_id in requested_ids if sweet_id not in sweets_by_id]
+        
+        return Response({
+            'results': self.get_serializer(found, many=True).data,
+            'missing': missing
+        }, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    @coalesce
+    def changes(self, request):
+        """
+        Delta sync: sweets changed and ids deleted after a watermark
+        Query params: since (watermark returned by a previous call; omit for
+        a full sync), limit (page size, capped by SWEETS_SYNC_PAGE_SIZE)
+        
+        updated_at is stamped before commit, so rows newer than
+        SWEETS_SYNC_SAFETY_LAG seconds are held back until any transaction
+        that could still commit an older stamp has finished. When has_more
+        is true, call again with the returned watermark.
+        """
+        max_limit = getattr(settings, 'SWEETS_SYNC_PAGE_SIZE', 500)
+        try:
+            limit = int(request.query_params.get('limit', max_limit))
+        except ValueError:
+            return Response(
+                {'error': 'Invalid limit value'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(1, min(limit, max_limit))
+        
+        cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'SWEETS_SYNC_SAFETY_LAG', 5))
+        queryset = self.get_queryset().filter(updated_at__lte=cutoff).order_by('updated_at', 'id')
+        
+        since = request.query_params.get('since', None)
+        if since:
+            since = parse_datetime(since)
+            if since is None:
+                return Response(
+                    {'error': 'Invalid since value'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            queryset = queryset.filter(updated_at__gt=since)
+        
+        rows = list(queryset[:limit + 1])
+        has_more = len(rows) > limit
+        if has_more:
+            # Never split sweets sharing a timestamp across pages, or the
+            # strict > on the next call would skip the rest of them
+            boundary = rows[limit].updated_at
+            changed = [sweet for sweet in rows[:limit] if sweet.updated_at < boundary]
+            if not changed:
+                changed = list(queryset.filter(updated_at=boundary))
+            watermark = changed[-1].updated_at
+        else:
+            changed = rows
+            watermark = cutoff if since is None else max(since, cutoff)
+        
+        # A full sync has nothing to delete; later calls get tombstones
+        # from the same window as the sweets
+        deleted = []
+        if since is not None:
+            deleted = DeletedSweet.objects.filter(
+                deleted_at__gt=since, deleted_at__lte=watermark
+            ).values_list('sweet_id', flat=True)
+        
+        return Response({
+            'changed': self.get_serializer(changed, many=True).data,
+            'deleted': [str(sweet_id) for sweet_id in deleted],
+            'watermark': DateTimeField().to_representation(watermark),
+            'has_more': has_more
+        }, status=status.HTTP_200_OK)
+    
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def purchase(self, request, pk=None):
         """
@@ -77,6 +407,8 @@ class SweetViewSet(viewsets.ModelViewSet):
             
             try:
                 sweet.purchase(amount)
+                if sweet.quantity <= getattr(settings, 'SWEETS_LOW_STOCK_THRESHOLD', 5):
+                    notify_low_stock.delay(str(sweet.id))
                 return Response({
                     'message': f'Successfully purchased {amount} {sweet.name}(s)',
                     'remaining_quantity': sweet.quantity
@@ -112,4 +444,56 @@ class SweetViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+async def stock_stream(request):
+    """
+    Server-Sent Events stream of live stock changes (serve via ASGI)
+    Each event carries {id, quantity, is_in_stock, price}; rapid updates to
+    the same sweet are coalesced. Clients that fall too far behind receive
+    an "overflow" event and are disconnected, and should resync via
+    /api/sweets/changes/.
+    
+    Under WSGI the stream would hold a worker forever, so it is refused
+    with 501 there.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'The stock stream is only served over ASGI'},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+    
+    try:
+        auth = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as e:
+        return JsonResponse({'detail': str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    if auth is None:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    
+    keepalive = getattr(settings, 'SWEETS_STREAM_KEEPALIVE', 15)
+    subscription = broadcaster.subscribe()
+    
+    async def events():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                pending = await subscription.get(timeout=keepalive)
+                if subscription.dropped:
+                    yield 'event: overflow\ndata: {}\n\n'
+                    break
+                if not pending:
+                    yield ': keep-alive\n\n'
+                    continue
+                for event in pending:
+                    yield f'event: stock\ndata: {json.dumps(event)}\n\n'
+        finally:
+            broadcaster.unsubscribe(subscription)
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response